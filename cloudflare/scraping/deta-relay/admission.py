@@ -0,0 +1,169 @@
+"""
+Contrôle d'admission du relais
+
+Au plus max_concurrency requêtes de scraping s'exécutent en même temps ; les
+suivantes attendent dans une file bornée :
+- par classe de priorité d'abord (pages de liste, puis pages de détail,
+  puis nouvelles tentatives)
+- à tour de rôle entre clients au sein d'une même classe, pour qu'un client
+  qui envoie beaucoup de requêtes ne bloque pas les autres
+
+Quand la file est pleine, une requête plus prioritaire que la dernière
+arrivée de la classe la moins prioritaire prend sa place : c'est cette
+dernière qui est refusée. Sinon la nouvelle requête est refusée. Dans les
+deux cas le refus est immédiat (503 avec Retry-After) plutôt que d'attendre
+l'expiration du délai côté client. Une
+requête restée trop longtemps dans la file est abandonnée avant d'avoir
+sollicité le site cible.
+"""
+
+import asyncio
+import itertools
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+# Classes de priorité, de la plus prioritaire à la moins prioritaire
+PRIORITIES = ("listing", "detail", "retry")
+DEFAULT_PRIORITY = "detail"
+
+
+class QueueFullError(Exception):
+    """La file d'attente est pleine ou l'attente a dépassé le délai maximum"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """File d'attente à priorités avec partage équitable entre clients"""
+
+    def __init__(self, max_concurrency=8, max_queue=32, max_wait=20.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._running = 0
+        self._waiting = 0
+        # Pour chaque priorité : client -> file des requêtes en attente (numéro d'arrivée, future)
+        self._queues = {priority: OrderedDict() for priority in PRIORITIES}
+        # Durée moyenne (lissée) d'une requête, pour estimer Retry-After
+        self._service_time = 2.0
+        self._arrivals = itertools.count()
+        self.stats = {"admitted": 0, "rejected": 0, "evicted": 0, "expired": 0}
+
+    def retry_after(self):
+        """Estimation en secondes du temps nécessaire pour vider la file"""
+        estimate = self._service_time * (self._waiting + 1) / self.max_concurrency
+        return max(1, min(60, math.ceil(estimate)))
+
+    def snapshot(self):
+        """État courant de la file, pour le suivi"""
+        return {
+            "running": self._running,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "service_time": round(self._service_time, 3),
+            **self.stats,
+        }
+
+    def _enqueue(self, client, priority):
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(client, deque()).append((next(self._arrivals), future))
+        self._waiting += 1
+        return future
+
+    def _evict(self, priority):
+        """
+        Refuse la dernière requête arrivée dans la classe la moins prioritaire
+        en attente, si elle est moins prioritaire que priority.
+        Retourne True si une place a été libérée dans la file.
+        """
+        for lower in reversed(PRIORITIES[PRIORITIES.index(priority) + 1:]):
+            queue = self._queues[lower]
+            newest = None
+            for client, waiters in queue.items():
+                for entry in waiters:
+                    if not entry[1].done() and (newest is None or entry[0] > newest[1][0]):
+                        newest = (client, entry)
+            if newest is None:
+                continue
+            client, entry = newest
+            queue[client].remove(entry)
+            if not queue[client]:
+                del queue[client]
+            self._waiting -= 1
+            self.stats["evicted"] += 1
+            entry[1].set_exception(QueueFullError("Remplacée par une requête plus prioritaire", self.retry_after()))
+            return True
+        return False
+
+    def _release(self):
+        """Libère une place et la transmet à la prochaine requête en attente"""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                client, waiters = next(iter(queue.items()))
+                _, future = waiters.popleft()
+                if waiters:
+                    # Tour de rôle : le client passe en fin de file
+                    queue.move_to_end(client)
+                else:
+                    del queue[client]
+                if future.cancelled():
+                    continue
+                self._waiting -= 1
+                # La place est transmise directement : _running ne change pas
+                future.set_result(None)
+                return
+        self._running -= 1
+
+    @asynccontextmanager
+    async def slot(self, client, priority=DEFAULT_PRIORITY):
+        """
+        Attend une place d'exécution et retourne le temps d'attente (en secondes).
+        Lève QueueFullError si la file est pleine, si l'attente est trop longue
+        ou si la requête est remplacée par une requête plus prioritaire.
+        """
+        if priority not in PRIORITIES:
+            priority = DEFAULT_PRIORITY
+
+        start = time.perf_counter()
+        if self._running < self.max_concurrency and not self._waiting:
+            self._running += 1
+        else:
+            if self._waiting >= self.max_queue and not self._evict(priority):
+                self.stats["rejected"] += 1
+                raise QueueFullError("File d'attente pleine", self.retry_after())
+
+            future = self._enqueue(client, priority)
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+            except asyncio.TimeoutError:
+                if not future.done():
+                    future.cancel()
+                    self._waiting -= 1
+                    self.stats["expired"] += 1
+                    raise QueueFullError("Délai d'attente dépassé", self.retry_after())
+                # Remplacée au moment de l'expiration : la requête n'a pas de place
+                if future.exception() is not None:
+                    raise future.exception()
+            except asyncio.CancelledError:
+                # Client déconnecté : on rend la place si elle venait d'être attribuée
+                if not future.done():
+                    future.cancel()
+                    self._waiting -= 1
+                elif future.exception() is None:
+                    self._release()
+                # Sinon la requête a été remplacée et déjà retirée de la file
+                raise
+
+        self.stats["admitted"] += 1
+        started = time.perf_counter()
+        try:
+            yield started - start
+        finally:
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.perf_counter() - started)
+            self._release()
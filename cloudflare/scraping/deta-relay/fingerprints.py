@@ -0,0 +1,83 @@
+"""
+Empreintes de contenu des pages récupérées par le relais
+
+Chaque page reçoit deux empreintes :
+- sha256 : hachage exact du HTML, identique si la page n'a pas bougé d'un octet
+- simhash : SimHash 64 bits du contenu principal (navigation, scripts, pieds
+  de page... retirés), quasi identique si seul l'habillage de la page change
+
+Seul un sha256 identique signifie que la page est inchangée et peut être
+ignorée par les étapes d'extraction et d'import. Un SimHash proche n'est
+qu'une indication (near_duplicate) : le HTML est toujours renvoyé.
+
+Le relais ne conserve aucune empreinte : l'hébergement n'a pas de disque
+persistant et perd son état à chaque mise en veille. Le client garde
+l'empreinte de la dernière version traitée de chaque page (KV du Worker)
+et la renvoie avec la requête suivante.
+"""
+
+import hashlib
+import re
+from collections import Counter
+
+# Balises considérées comme de l'habillage et non du contenu
+BOILERPLATE_TAGS = ["script", "style", "noscript", "iframe", "svg", "nav", "header", "footer", "aside", "form"]
+
+# Distance de Hamming maximale entre deux SimHash d'une page quasi identique
+SIMHASH_THRESHOLD = 3
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def main_text(soup):
+    """Retourne le texte du contenu principal d'une page (modifie le soup)"""
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    root = soup.find("main") or soup.find("article") or soup.body or soup
+    return root.get_text(" ", strip=True)
+
+
+def simhash(text, shingle_size=3):
+    """Calcule le SimHash 64 bits d'un texte à partir de ses n-grammes de mots"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = Counter([" ".join(words)])
+    else:
+        shingles = Counter(" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+
+    vector = [0] * 64
+    for shingle, weight in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            vector[bit] += weight if value >> bit & 1 else -weight
+    return sum(1 << bit for bit in range(64) if vector[bit] > 0)
+
+
+def hamming_distance(a, b):
+    """Nombre de bits différents entre deux SimHash"""
+    return bin(a ^ b).count("1")
+
+
+def page_fingerprint(html, soup):
+    """Retourne les empreintes d'une page : {"sha256", "simhash"} (simhash en hexadécimal)"""
+    return {
+        "sha256": hashlib.sha256(html.encode("utf-8")).hexdigest(),
+        "simhash": f"{simhash(main_text(soup)):016x}",
+    }
+
+
+def compare_fingerprints(previous, fingerprint, threshold=SIMHASH_THRESHOLD):
+    """
+    Compare une empreinte à la dernière empreinte traitée fournie par le client.
+    Retourne {"unchanged": sha256 identique, "near_duplicate": SimHash proche}.
+    """
+    if not previous:
+        return {"unchanged": False, "near_duplicate": False}
+    try:
+        distance = hamming_distance(int(previous.get("simhash", ""), 16), int(fingerprint["simhash"], 16))
+    except ValueError:
+        distance = threshold + 1
+    return {
+        "unchanged": previous.get("sha256") == fingerprint["sha256"],
+        "near_duplicate": distance <= threshold,
+    }
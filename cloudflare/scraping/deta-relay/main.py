@@ -1,11 +1,24 @@
-from fastapi import FastAPI, Request, HTTPException
+import time
+
+# Début du démarrage : sert à mesurer les phases du démarrage à froid
+BOOT_START = time.perf_counter()
+
+from fastapi import FastAPI, Request, Response, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import os
 import random
-import time
+import threading
+from typing import Dict, List, Optional
 import uvicorn
+from admission import AdmissionController, QueueFullError
+from fingerprints import compare_fingerprints, page_fingerprint
+from page_archive import PageArchive
+
+# Durées (en ms) des phases du démarrage, affichées au boot et renvoyées par /warmup
+BOOT_TIMINGS = {"imports": round((time.perf_counter() - BOOT_START) * 1000, 1)}
 
 app = FastAPI(title="FloDrama Scraping Relay")
 
@@ -18,6 +31,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+BOOT_TIMINGS["app"] = round((time.perf_counter() - BOOT_START) * 1000, 1)
+
+# Hôtes les plus scrapés, dont la connexion TLS est ouverte dès le démarrage
+WARMUP_HOSTS = os.getenv(
+    "WARMUP_HOSTS",
+    "https://mydramalist.com,https://v5.voiranime.com,https://voirdrama.org,"
+    "https://anime-sama.fr,https://vostfree.tv,https://asianwiki.com"
+).split(",")
+
+# Archive des pages : "record" enregistre chaque page récupérée,
+# "replay" sert les pages depuis l'archive sans aucun accès réseau
+ARCHIVE_MODE = os.getenv("RELAY_ARCHIVE_MODE", "off")
+archive = PageArchive(os.getenv("RELAY_ARCHIVE_DIR", "archive")) if ARCHIVE_MODE in ("record", "replay") else None
+
+# Contrôle d'admission : requêtes simultanées, taille de la file et attente maximale (s)
+admission = AdmissionController(
+    max_concurrency=int(os.getenv("RELAY_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("RELAY_MAX_QUEUE", "32")),
+    max_wait=float(os.getenv("RELAY_MAX_QUEUE_WAIT", "20"))
+)
+
 # Liste des User-Agents pour simuler différents navigateurs
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
@@ -33,8 +67,129 @@ def get_random_user_agent():
     """Retourne un User-Agent aléatoire de la liste"""
     return random.choice(USER_AGENTS)
 
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Retourne la session HTTP partagée (import de requests différé au premier usage).
+    La session garde les connexions ouvertes : les requêtes suivantes vers un
+    même hôte évitent une nouvelle poignée de main TLS.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+def extract_title(html):
+    """Extrait le titre de la page (import de BeautifulSoup différé au premier usage)"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    return soup.title.text if soup.title else None
+
+def analyze_page(html):
+    """Analyse le HTML une seule fois et retourne (titre, empreintes)"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.title.text if soup.title else None
+    return title, page_fingerprint(html, soup)
+
+def page_result(request, html, status, final_url, content_type):
+    """
+    Construit la réponse de /scrape.
+    Les empreintes (SimHash coûteux en CPU) ne sont calculées que si le client
+    les demande (fingerprint) ou fournit la dernière empreinte traitée
+    (previous). Si le HTML est identique à celle-ci et que le client l'a
+    demandé (skip_unchanged), le HTML n'est pas renvoyé.
+    """
+    if not (request.fingerprint or request.previous or request.skip_unchanged):
+        return {
+            "html": html,
+            "title": extract_title(html),
+            "status": status,
+            "url": final_url,
+            "content_type": content_type
+        }
+
+    title, fingerprint = analyze_page(html)
+    comparison = compare_fingerprints(request.previous, fingerprint)
+    return {
+        "html": None if comparison["unchanged"] and request.skip_unchanged else html,
+        "title": title,
+        "status": status,
+        "url": final_url,
+        "content_type": content_type,
+        "fingerprint": fingerprint,
+        "unchanged": comparison["unchanged"],
+        "near_duplicate": comparison["near_duplicate"]
+    }
+
+def warm_up(hosts=None):
+    """
+    Charge les modules d'analyse et ouvre les connexions vers les hôtes
+    les plus scrapés (sauf en mode rejeu, qui n'accède jamais au réseau).
+    Retourne les durées (en ms) de chaque étape.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    extract_title("<title></title>")
+    timings["parser"] = round((time.perf_counter() - start) * 1000, 1)
+
+    if ARCHIVE_MODE == "replay":
+        return timings
+
+    session = get_session()
+    for host in hosts or WARMUP_HOSTS:
+        host = host.strip()
+        if not host:
+            continue
+        start = time.perf_counter()
+        try:
+            session.head(host, headers={'User-Agent': get_random_user_agent()}, timeout=5, allow_redirects=False)
+            timings[host] = round((time.perf_counter() - start) * 1000, 1)
+        except Exception:
+            timings[host] = None
+    return timings
+
+@app.on_event("startup")
+async def startup():
+    """Affiche les durées du démarrage et préchauffe les connexions en arrière-plan"""
+    BOOT_TIMINGS["startup"] = round((time.perf_counter() - BOOT_START) * 1000, 1)
+    print(f"Démarrage du relais: {BOOT_TIMINGS}")
+
+    def background_warm_up():
+        timings = warm_up()
+        BOOT_TIMINGS["warmup"] = round((time.perf_counter() - BOOT_START) * 1000, 1)
+        print(f"Préchauffage terminé: {timings}")
+
+    # Le préchauffage ne retarde pas l'ouverture du port
+    threading.Thread(target=background_warm_up, daemon=True).start()
+
 class ScrapeRequest(BaseModel):
     url: str
+    # En mode rejeu : servir la dernière capture antérieure à cette date (ISO 8601)
+    archive_at: Optional[str] = None
+    # Calculer les empreintes de la page (sha256 et SimHash)
+    fingerprint: bool = False
+    # Dernière empreinte traitée par le client ({"sha256", "simhash"}), comparée à la page
+    previous: Optional[Dict[str, str]] = None
+    # Ne pas renvoyer le HTML si la page est identique à previous
+    skip_unchanged: bool = False
+    # Classe de priorité dans la file d'attente : listing, detail ou retry
+    priority: str = "detail"
+    # Identifiant du client pour le partage équitable (par défaut : en-tête X-Client-Id ou IP)
+    client_id: Optional[str] = None
+
+class WarmupRequest(BaseModel):
+    hosts: List[str] = []
 
 @app.get("/")
 async def root():
@@ -44,10 +199,75 @@ async def root():
 @app.get("/ping")
 async def ping():
     """Endpoint de ping pour vérifier que le serveur est opérationnel"""
-    return {"status": "ok", "message": "Le serveur relais est opérationnel", "timestamp": time.time()}
+    return {
+        "status": "ok",
+        "message": "Le serveur relais est opérationnel",
+        "timestamp": time.time(),
+        "queue": admission.snapshot()
+    }
+
+@app.post("/warmup")
+async def warmup(request: WarmupRequest = None):
+    """
+    Endpoint de préchauffage, appelé par le Worker avant une série de scraping.
+    Réveille l'instance, charge les modules d'analyse et ouvre les connexions.
+    """
+    hosts = request.hosts if request and request.hosts else None
+    timings = await run_in_threadpool(warm_up, hosts)
+    return {"status": "ok", "boot": BOOT_TIMINGS, "warmup": timings, "timestamp": time.time()}
+
+def fetch_page(request: ScrapeRequest):
+    """Récupère la page sur le site cible (exécuté dans un thread)"""
+    url = request.url
+    
+    # Configurer les headers pour simuler un navigateur réel
+    headers = {
+        'User-Agent': get_random_user_agent(),
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+        'Accept-Language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Referer': 'https://www.google.com/',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'cross-site',
+        'Sec-Fetch-User': '?1',
+        'Cache-Control': 'max-age=0'
+    }
+    
+    # Effectuer la requête HTTP
+    response = get_session().get(
+        url, 
+        headers=headers, 
+        timeout=30,
+        allow_redirects=True
+    )
+    response.raise_for_status()
+    
+    if ARCHIVE_MODE == "record":
+        archive.record(url, response.status_code, response.headers, response.text, response.url)
+    
+    # Retourner le HTML, les métadonnées et les empreintes
+    # (response.url : URL finale après redirections)
+    return page_result(request, response.text, response.status_code, response.url, response.headers.get('Content-Type'))
+
+def replay_page(request: ScrapeRequest):
+    """Sert la page depuis l'archive (exécuté dans un thread)"""
+    try:
+        entry = archive.lookup(request.url, request.archive_at)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Date d'archive invalide: {request.archive_at}")
+    if not entry:
+        raise HTTPException(status_code=404, detail=f"Page absente de l'archive: {request.url}")
+    record = archive.read(entry)
+    result = page_result(request, record["body"], record["status"], record["url"], record["headers"].get('Content-Type'))
+    result["archived_at"] = record["timestamp"]
+    return result
 
 @app.post("/scrape")
-async def scrape(request: ScrapeRequest):
+async def scrape(request: ScrapeRequest, http_request: Request, response: Response):
     """
     Point d'entrée principal pour le scraping.
     Récupère le HTML d'une URL en contournant les protections anti-bot.
@@ -57,52 +277,36 @@ async def scrape(request: ScrapeRequest):
     if not url:
         raise HTTPException(status_code=400, detail="URL manquante")
     
+    client = request.client_id or http_request.headers.get("X-Client-Id") or (
+        http_request.client.host if http_request.client else "inconnu"
+    )
+    
     try:
-        # Ajouter un délai aléatoire pour éviter la détection
-        time.sleep(random.uniform(1, 3))
-        
-        # Configurer les headers pour simuler un navigateur réel
-        headers = {
-            'User-Agent': get_random_user_agent(),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Referer': 'https://www.google.com/',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'cross-site',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0'
-        }
-        
-        # Effectuer la requête HTTP
-        response = requests.get(
-            url, 
-            headers=headers, 
-            timeout=30,
-            allow_redirects=True
+        async with admission.slot(client, request.priority) as queue_wait:
+            if ARCHIVE_MODE == "replay":
+                result = await run_in_threadpool(replay_page, request)
+            else:
+                # Ajouter un délai aléatoire pour éviter la détection
+                await asyncio.sleep(random.uniform(1, 3))
+                result = await run_in_threadpool(fetch_page, request)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Serveur relais surchargé: {str(e)}",
+            headers={"Retry-After": str(e.retry_after)}
         )
-        response.raise_for_status()
-        
-        # Analyser le HTML avec BeautifulSoup
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Retourner le HTML et les métadonnées
-        return {
-            "html": response.text,
-            "title": soup.title.text if soup.title else None,
-            "status": response.status_code,
-            "url": response.url,  # URL finale après redirections
-            "content_type": response.headers.get('Content-Type')
-        }
-    
-    except requests.RequestException as e:
+    except HTTPException:
+        raise
+    except IOError as e:  # requests.RequestException hérite d'IOError
         raise HTTPException(status_code=500, detail=f"Erreur de requête: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+    
+    # Temps passé dans la file d'attente avant le traitement
+    queue_wait_ms = round(queue_wait * 1000, 1)
+    response.headers["X-Queue-Wait-Ms"] = str(queue_wait_ms)
+    result["queue_wait_ms"] = queue_wait_ms
+    return result
 
 # Pour le développement local uniquement
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+"""
+Archive des pages récupérées par le relais (enregistrement / rejeu)
+
+Les réponses sont ajoutées à la fin d'un fichier pages.warc.gz au format
+WARC : chaque enregistrement est un membre gzip indépendant, ce qui permet
+de relire n'importe quelle page directement à partir de sa position. Un
+index (pages.cdx.jsonl, une ligne JSON par enregistrement) associe chaque
+URL à ses captures successives (date, position, taille).
+
+Utilisation en ligne de commande :
+    python page_archive.py list [--dir archive]
+    python page_archive.py bench [--dir archive] [--parser module:fonction]
+"""
+
+import argparse
+import gzip
+import importlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+
+def parse_timestamp(value):
+    """Convertit une date ISO 8601 (date seule, Z ou décalage horaire) en datetime UTC"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class PageArchive:
+    """Archive WARC en ajout seul, indexée par URL et date de capture"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.warc_path = os.path.join(directory, "pages.warc.gz")
+        self.index_path = os.path.join(directory, "pages.cdx.jsonl")
+        self._lock = threading.Lock()
+        self._index = {}
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._index.setdefault(entry["url"], []).append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._index.values())
+
+    def urls(self):
+        """Retourne les URLs archivées"""
+        return list(self._index)
+
+    def captures(self, url):
+        """Retourne les entrées d'index d'une URL, de la plus ancienne à la plus récente"""
+        return list(self._index.get(url, []))
+
+    def record(self, url, status, headers, body, final_url=None):
+        """Ajoute une réponse à l'archive et retourne son entrée d'index"""
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        payload = body.encode("utf-8") if isinstance(body, str) else body
+
+        http_block = f"HTTP/1.1 {status}\r\n".encode("utf-8")
+        for name, value in headers.items():
+            # Le corps est stocké décompressé : ces en-têtes ne s'appliquent plus
+            if name.lower() in ("content-encoding", "content-length", "transfer-encoding"):
+                continue
+            http_block += f"{name}: {value}\r\n".encode("utf-8")
+        http_block += b"\r\n" + payload
+
+        warc_headers = (
+            "WARC/1.1\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {timestamp}\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(http_block)}\r\n"
+            "\r\n"
+        ).encode("utf-8")
+        member = gzip.compress(warc_headers + http_block + b"\r\n\r\n")
+
+        with self._lock:
+            with open(self.warc_path, "ab") as f:
+                offset = f.tell()
+                f.write(member)
+            entry = {
+                "url": url,
+                "timestamp": timestamp,
+                "offset": offset,
+                "length": len(member),
+                "status": status,
+                "final_url": final_url or url,
+            }
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._index.setdefault(url, []).append(entry)
+        return entry
+
+    def lookup(self, url, at=None):
+        """
+        Retourne l'entrée d'index de la capture la plus récente d'une URL,
+        ou de la dernière capture antérieure à la date at (ISO 8601, UTC si
+        aucun fuseau n'est indiqué). Lève ValueError si at est invalide.
+        """
+        entries = self._index.get(url)
+        if not entries:
+            return None
+        if at:
+            limit = parse_timestamp(at)
+            entries = [e for e in entries if parse_timestamp(e["timestamp"]) <= limit]
+        return entries[-1] if entries else None
+
+    def read(self, entry):
+        """Relit une capture et retourne {"status", "headers", "body", "url", "timestamp"}"""
+        with open(self.warc_path, "rb") as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        record = gzip.decompress(member)
+
+        _, _, http_block = record.partition(b"\r\n\r\n")
+        http_head, _, body = http_block.partition(b"\r\n\r\n")
+        lines = http_head.decode("utf-8").split("\r\n")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(": ")
+            headers[name] = value
+
+        return {
+            "status": int(lines[0].split(" ")[1]),
+            "headers": headers,
+            # Retrait du séparateur de fin d'enregistrement WARC
+            "body": body[:-4].decode("utf-8", errors="replace"),
+            "url": entry["final_url"],
+            "timestamp": entry["timestamp"],
+        }
+
+    def iter_records(self):
+        """Parcourt toutes les captures dans l'ordre d'enregistrement"""
+        entries = sorted((e for es in self._index.values() for e in es), key=lambda e: e["offset"])
+        for entry in entries:
+            yield entry, self.read(entry)
+
+
+def load_parser(spec):
+    """Charge une fonction d'analyse à partir d'une chaîne module:fonction"""
+    module_name, _, function_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive des pages du relais FloDrama")
+    parser.add_argument("command", choices=["list", "bench"])
+    parser.add_argument("--dir", default=os.getenv("RELAY_ARCHIVE_DIR", "archive"), help="Dossier de l'archive")
+    parser.add_argument("--parser", default="main:extract_title", help="Fonction d'analyse à mesurer (module:fonction)")
+    args = parser.parse_args()
+
+    archive = PageArchive(args.dir)
+
+    if args.command == "list":
+        for url in archive.urls():
+            captures = archive.captures(url)
+            print(f"{url} ({len(captures)} captures, dernière: {captures[-1]['timestamp']})")
+        print(f"\nTotal: {len(archive)} captures, {len(archive.urls())} URLs")
+        return
+
+    # Rejeu de toute l'archive à travers la fonction d'analyse, sans réseau
+    parse = load_parser(args.parser)
+    pages = 0
+    size = 0
+    read_time = 0.0
+    parse_time = 0.0
+    start = time.perf_counter()
+    for _, record in archive.iter_records():
+        read_time += time.perf_counter() - start
+        start = time.perf_counter()
+        parse(record["body"])
+        parse_time += time.perf_counter() - start
+        pages += 1
+        size += len(record["body"])
+        start = time.perf_counter()
+
+    if not pages:
+        print("Archive vide")
+        return
+    print(f"Pages: {pages} ({size / 1024 / 1024:.1f} Mo)")
+    print(f"Lecture: {read_time:.2f}s ({pages / read_time:.0f} pages/s)" if read_time else "Lecture: 0s")
+    print(f"Analyse ({args.parser}): {parse_time:.2f}s ({pages / parse_time:.0f} pages/s, "
+          f"{size / 1024 / 1024 / parse_time:.1f} Mo/s)" if parse_time else f"Analyse ({args.parser}): 0s")
+
+
+if __name__ == "__main__":
+    main()
@@ -42,15 +42,16 @@ class NekoSamaScraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
     
     try {
       // Utiliser le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -72,7 +73,7 @@ class NekoSamaScraper {
       const startTime = Date.now();
       
       // Récupérer la page des animes
-      const html = await this.fetchHtml('/animes', env);
+      const html = await this.fetchHtml('/animes', env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -156,7 +157,7 @@ class NekoSamaScraper {
       const startTime = Date.now();
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/animes/search?q=${encodeURIComponent(query)}`, env);
+      const html = await this.fetchHtml(`/animes/search?q=${encodeURIComponent(query)}`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -347,15 +348,16 @@ class AnimeSamaScraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
     
     try {
       // Utiliser le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -377,7 +379,7 @@ class AnimeSamaScraper {
       const startTime = Date.now();
       
       // Récupérer la page du catalogue
-      const html = await this.fetchHtml('/catalogue/', env);
+      const html = await this.fetchHtml('/catalogue/', env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -460,7 +462,7 @@ class AnimeSamaScraper {
       const startTime = Date.now();
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/catalogue/?s=${encodeURIComponent(query)}`, env);
+      const html = await this.fetchHtml(`/catalogue/?s=${encodeURIComponent(query)}`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
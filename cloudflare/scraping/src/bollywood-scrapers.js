@@ -42,15 +42,16 @@ class Zee5Scraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
     
     try {
       // Utiliser le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -72,7 +73,7 @@ class Zee5Scraper {
       const startTime = Date.now();
       
       // Récupérer la page des films
-      const html = await this.fetchHtml('/movies', env);
+      const html = await this.fetchHtml('/movies', env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -157,7 +158,7 @@ class Zee5Scraper {
       const startTime = Date.now();
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/search?q=${encodeURIComponent(query)}`, env);
+      const html = await this.fetchHtml(`/search?q=${encodeURIComponent(query)}`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -42,15 +42,16 @@ class VoirDramaScraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
     
     try {
       // Utiliser le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -72,7 +73,7 @@ class VoirDramaScraper {
       const startTime = Date.now();
       
       // Récupérer la page des dramas
-      const html = await this.fetchHtml('/drama/', env);
+      const html = await this.fetchHtml('/drama/', env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -156,7 +157,7 @@ class VoirDramaScraper {
       const startTime = Date.now();
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/?s=${encodeURIComponent(query)}`, env);
+      const html = await this.fetchHtml(`/?s=${encodeURIComponent(query)}`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -349,15 +350,16 @@ class AsianWikiScraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
     
     try {
       // Utiliser le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -379,7 +381,7 @@ class AsianWikiScraper {
       const startTime = Date.now();
       
       // Récupérer la page des dramas coréens
-      const html = await this.fetchHtml('/wiki/Category:Korean_Movies', env);
+      const html = await this.fetchHtml('/wiki/Category:Korean_Movies', env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -451,7 +453,7 @@ class AsianWikiScraper {
       const startTime = Date.now();
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/index.php?search=${encodeURIComponent(query)}`, env);
+      const html = await this.fetchHtml(`/index.php?search=${encodeURIComponent(query)}`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -42,15 +42,16 @@ class CoflixScraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
     
     try {
       // Utiliser le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -72,7 +73,7 @@ class CoflixScraper {
       const startTime = Date.now();
       
       // Récupérer la page des films
-      const html = await this.fetchHtml('/films', env);
+      const html = await this.fetchHtml('/films', env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -156,7 +157,7 @@ class CoflixScraper {
       const startTime = Date.now();
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/search?q=${encodeURIComponent(query)}`, env);
+      const html = await this.fetchHtml(`/search?q=${encodeURIComponent(query)}`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -349,15 +350,16 @@ class VostFreeScraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
     
     try {
       // Utiliser le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -379,7 +381,7 @@ class VostFreeScraper {
       const startTime = Date.now();
       
       // Récupérer la page des films
-      const html = await this.fetchHtml('/films', env);
+      const html = await this.fetchHtml('/films', env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -459,7 +461,7 @@ class VostFreeScraper {
       const startTime = Date.now();
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/index.php?do=search&subaction=search&story=${encodeURIComponent(query)}`, env);
+      const html = await this.fetchHtml(`/index.php?do=search&subaction=search&story=${encodeURIComponent(query)}`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -650,15 +652,16 @@ class TopStreamScraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
     
     try {
       // Utiliser le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -680,7 +683,7 @@ class TopStreamScraper {
       const startTime = Date.now();
       
       // Récupérer la page des films
-      const html = await this.fetchHtml('/films', env);
+      const html = await this.fetchHtml('/films', env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -764,7 +767,7 @@ class TopStreamScraper {
       const startTime = Date.now();
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/search?q=${encodeURIComponent(query)}`, env);
+      const html = await this.fetchHtml(`/search?q=${encodeURIComponent(query)}`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
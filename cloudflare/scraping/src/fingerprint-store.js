@@ -0,0 +1,69 @@
+/**
+ * Empreintes des pages déjà traitées, conservées dans l'espace KV du Worker
+ *
+ * Le serveur relais ne garde aucun état : le Worker lui renvoie la dernière
+ * empreinte traitée d'une page pour savoir si elle a changé. Une empreinte
+ * n'est enregistrée qu'une fois la page traitée avec succès.
+ */
+
+// Durée de conservation d'une empreinte (30 jours)
+const FINGERPRINT_TTL = 60 * 60 * 24 * 30;
+
+class FingerprintStore {
+  /**
+   * @param {Object} kv - Espace KV (binding METADATA)
+   */
+  constructor(kv) {
+    this.kv = kv;
+  }
+
+  /**
+   * Clé KV d'une URL
+   * @param {string} url - URL de la page
+   * @returns {string} - Clé KV
+   */
+  key(url) {
+    return `fingerprint_${url}`;
+  }
+
+  /**
+   * Retourne la dernière empreinte traitée d'une URL
+   * @param {string} url - URL de la page
+   * @returns {Promise<object|null>} - { sha256, simhash, processed_at } ou null
+   */
+  async get(url) {
+    if (!this.kv) {
+      return null;
+    }
+    try {
+      return await this.kv.get(this.key(url), 'json');
+    } catch (error) {
+      console.error(`Erreur lors de la lecture de l'empreinte de ${url}: ${error.message}`);
+      return null;
+    }
+  }
+
+  /**
+   * Enregistre l'empreinte d'une page traitée avec succès
+   * @param {string} url - URL de la page
+   * @param {object} fingerprint - Empreinte renvoyée par le relais ({ sha256, simhash })
+   */
+  async markProcessed(url, fingerprint) {
+    if (!this.kv || !fingerprint) {
+      return;
+    }
+    try {
+      await this.kv.put(this.key(url), JSON.stringify({
+        sha256: fingerprint.sha256,
+        simhash: fingerprint.simhash,
+        processed_at: new Date().toISOString()
+      }), {
+        expirationTtl: FINGERPRINT_TTL
+      });
+    } catch (error) {
+      console.error(`Erreur lors de l'enregistrement de l'empreinte de ${url}: ${error.message}`);
+    }
+  }
+}
+
+export { FingerprintStore };
@@ -59,8 +59,9 @@ class MyDramaListScraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
@@ -87,7 +88,7 @@ class MyDramaListScraper {
       }
       
       // Fallback sur le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -122,7 +123,7 @@ class MyDramaListScraper {
       // Essayer chaque URL jusqu'à ce qu'une fonctionne
       for (const url of urls) {
         try {
-          html = await this.fetchHtml(url, env);
+          html = await this.fetchHtml(url, env, 'listing');
           if (html) {
             this.debugLog(`Succès avec l'URL: ${url}`);
             break;
@@ -273,7 +274,7 @@ class MyDramaListScraper {
       const encodedQuery = encodeURIComponent(query);
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/search?q=${encodedQuery}&type=titles`, env);
+      const html = await this.fetchHtml(`/search?q=${encodedQuery}&type=titles`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -575,8 +576,9 @@ class VoirAnimeScraper {
   
   /**
    * Récupère le HTML d'une URL
+   * (priority : 'listing' pour les pages de liste et de recherche, 'detail' sinon)
    */
-  async fetchHtml(url, env) {
+  async fetchHtml(url, env, priority = 'detail') {
     const fullUrl = url.startsWith('http') ? url : `${this.baseUrl}${url}`;
     
     this.debugLog(`Récupération du HTML de ${fullUrl}`);
@@ -603,7 +605,7 @@ class VoirAnimeScraper {
       }
       
       // Fallback sur le serveur relais
-      const html = await this.relayClient.fetchHtml(fullUrl);
+      const html = await this.relayClient.fetchHtml(fullUrl, priority);
       
       if (!html) {
         throw new Error('HTML vide');
@@ -625,7 +627,7 @@ class VoirAnimeScraper {
       const startTime = Date.now();
       
       // Récupérer la page d'accueil
-      const html = await this.fetchHtml('/', env);
+      const html = await this.fetchHtml('/', env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -701,7 +703,7 @@ class VoirAnimeScraper {
       const startTime = Date.now();
       
       // Récupérer la page de recherche
-      const html = await this.fetchHtml(`/?s=${encodeURIComponent(query)}`, env);
+      const html = await this.fetchHtml(`/?s=${encodeURIComponent(query)}`, env, 'listing');
       
       // Parser le HTML avec Cheerio
       const $ = cheerio.load(html);
@@ -12,8 +12,10 @@ import { NekoSamaScraper, AnimeSamaScraper } from './anime-scrapers';
 import { CoflixScraper, VostFreeScraper, TopStreamScraper } from './film-scrapers';
 import { Zee5Scraper } from './bollywood-scrapers';
 import { RelayClient } from './relay-client';
+import { FingerprintStore } from './fingerprint-store';
 import ScrapingQueueManager from './queue-manager';
 import ScrapingMonitor from './scraping-monitor';
+import { ScrapingSpans } from './scraping-spans';
 
 // Configuration des sources
 const SOURCES = {
@@ -155,6 +157,18 @@ function setupPeriodicPing(env, ctx) {
   }, 50 * 60 * 1000);
 }
 
+/**
+ * Applique la configuration du Worker au client relais d'un scraper
+ * @param {Object} scraper - Instance de scraper
+ * @param {Object} env - Environnement Cloudflare Workers
+ * @returns {Object} - Le scraper
+ */
+function configureScraper(scraper, env) {
+  // Un identifiant par source : les sources se partagent équitablement la file du relais
+  scraper.relayClient.configure({ relayUrl: env.RELAY_URL, clientId: `flodrama-worker:${scraper.name}` });
+  return scraper;
+}
+
 /**
  * Gestionnaire de requêtes HTTP
  */
@@ -369,7 +383,7 @@ async function handleRequest(request, env, ctx) {
       throw new Error(`Scraper non disponible pour ${source}`);
     }
     
-    const scraper = new ScraperClass(debug);
+    const scraper = configureScraper(new ScraperClass(debug), env);
     
     // Exécuter l'action demandée
     let result;
@@ -453,7 +467,7 @@ async function processQueuedTasks(env) {
     
     // Initialiser le scraper
     const scraperClass = SOURCES[source].scraper;
-    const scraper = new scraperClass(debug);
+    const scraper = configureScraper(new scraperClass(debug), env);
     
     // Exécuter l'action demandée
     let result;
@@ -509,7 +523,18 @@ async function handleScheduled(event, env, ctx) {
   
   try {
     console.log(`Début du scraping planifié (ID: ${scrapingId})`);
-    
+
+    // Réveiller le serveur relais pendant le scraping de la première source,
+    // seulement si les scrapers passent réellement par lui
+    const relayClient = new RelayClient().configure({ relayUrl: env.RELAY_URL });
+    if (relayClient.usesRelay()) {
+      ctx.waitUntil(relayClient.warmup().then(warmup => {
+        console.log(warmup
+          ? `Serveur relais préchauffé: ${JSON.stringify(warmup.warmup)}`
+          : 'Préchauffage du serveur relais impossible');
+      }));
+    }
+
     // Scraper chaque source
     for (const source of sources) {
       try {
@@ -525,16 +550,48 @@ async function handleScheduled(event, env, ctx) {
         
         // Créer une instance du scraper
         const scraperClass = scraperConfig.scraper;
-        const scraper = new scraperClass();
+        const scraper = configureScraper(new scraperClass(), env);
         
         // Activer le mode debug
         scraper.enableDebug(true);
         
+        // Ignorer les pages de liste identiques au dernier scraping traité
+        scraper.relayClient.configure({ fingerprints: new FingerprintStore(env.METADATA) });
+        
+        // Mesurer le temps de téléchargement des pages
+        const spans = new ScrapingSpans(source);
+        spans.wrap(scraper, 'fetchHtml', 'fetch');
+        
         // Scraper la source
-        const result = await scraper.scrape(50, env);
+        const scrapeStart = Date.now();
+        let result = await scraper.scrape(50, env);
+        
+        // Le reste du temps de scrape() correspond à l'analyse du HTML
+        spans.record('parse', Math.max(0, Date.now() - scrapeStart - spans.totalMs('fetch')));
+        
+        // Page de liste inchangée : rien de nouveau à enregistrer pour cette source
+        if (!result.success && scraper.relayClient.unchangedUrls.length) {
+          result = {
+            success: true,
+            skipped: true,
+            source: result.source,
+            content_type: result.content_type,
+            items_count: 0,
+            errors_count: 0,
+            duration_seconds: result.duration_seconds,
+            unchanged_urls: scraper.relayClient.unchangedUrls
+          };
+          console.log(`Source ${source} ignorée: page de liste inchangée`);
+        }
         
         // Enregistrer les résultats
-        await monitor.logSourceResult(scrapingId, source, result);
+        await spans.span('store', () => monitor.logSourceResult(scrapingId, source, result));
+        await monitor.logSourceTimings(scrapingId, source, scraperConfig.contentType, result, spans.summary());
+        
+        // Les empreintes ne sont enregistrées qu'une fois la source traitée avec succès
+        if (result.success && !result.skipped) {
+          await scraper.relayClient.markProcessed();
+        }
         
         console.log(`Scraping de ${source} terminé: ${result.items_count} éléments trouvés`);
       } catch (error) {
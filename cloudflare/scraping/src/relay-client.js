@@ -17,6 +17,52 @@ class RelayClient {
     this.maxRetries = 3;
     this.retryDelay = 1000;
     this.useDirectFetch = true; // Utiliser le fetch direct par défaut
+    this.clientId = null; // Identifiant stable pour le partage équitable de la file du relais
+    this.fingerprints = null; // FingerprintStore : pages de liste inchangées ignorées si défini
+    this.pendingFingerprints = new Map(); // Empreintes à enregistrer une fois les pages traitées
+    this.unchangedUrls = []; // Pages de liste ignorées car identiques au dernier traitement
+  }
+
+  /**
+   * Configure le client depuis l'environnement du Worker
+   * @param {object} options - { relayUrl, clientId, fingerprints } (les valeurs absentes sont ignorées)
+   * @returns {RelayClient} - L'instance courante pour le chaînage
+   */
+  configure({ relayUrl, clientId, fingerprints } = {}) {
+    if (relayUrl) {
+      this.relayUrl = relayUrl;
+    }
+    if (clientId) {
+      this.clientId = clientId;
+    }
+    if (fingerprints) {
+      this.fingerprints = fingerprints;
+    }
+    return this;
+  }
+
+  /**
+   * Headers des requêtes vers le relais
+   * @returns {object} - Headers HTTP
+   */
+  getRelayHeaders() {
+    const headers = {
+      'Content-Type': 'application/json'
+    };
+    // Sans identifiant, le relais utilise l'IP de sortie, qui change d'une requête à l'autre
+    if (this.clientId) {
+      headers['X-Client-Id'] = this.clientId;
+    }
+    return headers;
+  }
+
+  /**
+   * Indique si les requêtes peuvent réellement passer par le serveur relais
+   * (le relais Render par défaut n'est jamais utilisé en complément du fetch direct)
+   * @returns {boolean}
+   */
+  usesRelay() {
+    return !this.useDirectFetch || !this.relayUrl.includes('onrender.com');
   }
 
   /**
@@ -147,20 +193,21 @@ class RelayClient {
   /**
    * Effectue une requête vers le serveur de relais
    * @param {string} url - URL à scraper
+   * @param {string} priority - Priorité dans la file du relais (listing, detail ou retry)
    * @returns {Promise<string>} - HTML de la page
    */
-  async fetchViaRelay(url) {
+  async fetchViaRelay(url, priority = 'detail') {
     const endpoint = `${this.relayUrl}/scrape`;
     
     this.debugLog(`Requête vers le serveur relais ${endpoint} pour URL: ${url}`);
     
     const response = await fetch(endpoint, {
       method: 'POST',
-      headers: {
-        'Content-Type': 'application/json'
-      },
+      headers: this.getRelayHeaders(),
       body: JSON.stringify({ 
         url,
+        priority,
+        client_id: this.clientId,
         headers: this.getCustomHeaders(url)
       })
     });
@@ -185,16 +232,108 @@ class RelayClient {
     return result.html;
   }
 
+  /**
+   * Récupère une page via le relais en la comparant à la dernière version traitée
+   * (voir FingerprintStore : l'empreinte n'est enregistrée qu'une fois la page traitée)
+   * @param {string} url - URL à scraper
+   * @param {object|null} previous - Dernière empreinte traitée ({ sha256, simhash }) ou null
+   * @param {string} priority - Priorité dans la file du relais (listing, detail ou retry)
+   * @returns {Promise<object>} - { html, fingerprint, unchanged, nearDuplicate } (html est null si la page est inchangée)
+   */
+  async fetchIfChanged(url, previous = null, priority = 'detail') {
+    const response = await fetch(`${this.relayUrl}/scrape`, {
+      method: 'POST',
+      headers: this.getRelayHeaders(),
+      body: JSON.stringify({
+        url,
+        priority,
+        client_id: this.clientId,
+        fingerprint: true,
+        previous: previous ? { sha256: previous.sha256, simhash: previous.simhash } : null,
+        skip_unchanged: true
+      })
+    });
+
+    if (!response.ok) {
+      const errorText = await response.text();
+      throw new Error(`Erreur HTTP ${response.status}: ${errorText}`);
+    }
+
+    const result = await response.json();
+
+    this.debugLog(`Empreinte reçue du serveur relais pour ${url}`, {
+      fingerprint: result.fingerprint,
+      unchanged: result.unchanged,
+      nearDuplicate: result.near_duplicate
+    });
+
+    return {
+      html: result.html,
+      fingerprint: result.fingerprint,
+      unchanged: result.unchanged,
+      nearDuplicate: result.near_duplicate
+    };
+  }
+
+  /**
+   * Récupère une page de liste via le relais, sauf si elle est identique
+   * à la dernière version traitée (lève alors une erreur)
+   * @param {string} url - URL de la page de liste
+   * @returns {Promise<string|null>} - HTML de la page, ou null si le relais est indisponible
+   */
+  async fetchListingIfChanged(url) {
+    const previous = await this.fingerprints.get(url);
+    let result;
+    try {
+      result = await this.fetchIfChanged(url, previous, 'listing');
+    } catch (error) {
+      this.debugLog(`Échec de la requête conditionnelle via relais: ${error.message}`);
+      return null;
+    }
+
+    if (result.unchanged) {
+      this.unchangedUrls.push(url);
+      throw new Error(`Page inchangée depuis le dernier traitement: ${url}`);
+    }
+
+    this.pendingFingerprints.set(url, result.fingerprint);
+    return result.html;
+  }
+
+  /**
+   * Enregistre les empreintes des pages récupérées, à appeler une fois
+   * leur contenu traité avec succès
+   */
+  async markProcessed() {
+    if (!this.fingerprints) {
+      return;
+    }
+    for (const [url, fingerprint] of this.pendingFingerprints) {
+      await this.fingerprints.markProcessed(url, fingerprint);
+    }
+    this.pendingFingerprints.clear();
+  }
+
   /**
    * Effectue une requête avec retries
    * @param {string} url - URL à scraper
+   * @param {string} priority - Priorité dans la file du relais (listing pour les pages de liste, detail sinon)
    * @returns {Promise<string>} - HTML de la page
    */
-  async fetchHtml(url) {
+  async fetchHtml(url, priority = 'detail') {
+    if (priority === 'listing' && this.fingerprints && this.usesRelay()) {
+      const html = await this.fetchListingIfChanged(url);
+      if (html) {
+        return html;
+      }
+    }
+
     let retries = 0;
     let lastError = null;
     
     while (retries < this.maxRetries) {
+      // Les nouvelles tentatives passent après les premières requêtes dans la file du relais
+      const relayPriority = retries > 0 ? 'retry' : priority;
       try {
         this.debugLog(`Tentative ${retries + 1}/${this.maxRetries} pour URL: ${url}`);
         
@@ -209,7 +348,7 @@ class RelayClient {
             if (!this.relayUrl.includes('onrender.com')) {
               // Ne pas essayer le serveur relais Render par défaut car il est probablement hors service
               try {
-                return await this.fetchViaRelay(url);
+                return await this.fetchViaRelay(url, relayPriority);
               } catch (relayError) {
                 this.debugLog(`Échec de la requête via relais: ${relayError.message}`);
                 throw directError; // Relancer l'erreur directe si les deux méthodes échouent
@@ -221,7 +360,7 @@ class RelayClient {
         } else {
           // Si useDirectFetch est false, essayer d'abord avec le serveur relais
           try {
-            return await this.fetchViaRelay(url);
+            return await this.fetchViaRelay(url, relayPriority);
           } catch (relayError) {
             this.debugLog(`Échec de la requête via relais: ${relayError.message}`);
             
@@ -282,6 +421,39 @@ class RelayClient {
       return false;
     }
   }
+
+  /**
+   * Réveille le serveur relais et préchauffe ses connexions avant une série de scraping
+   * @param {string[]} hosts - Hôtes à préchauffer (par défaut ceux configurés sur le relais)
+   * @param {number} timeoutMs - Durée maximale d'attente de la réponse
+   * @returns {Promise<object|null>} - Durées de démarrage et de préchauffage, ou null en cas d'échec
+   */
+  async warmup(hosts = [], timeoutMs = 30000) {
+    const controller = new AbortController();
+    const timer = setTimeout(() => controller.abort(), timeoutMs);
+    try {
+      const start = Date.now();
+      const response = await fetch(`${this.relayUrl}/warmup`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ hosts }),
+        signal: controller.signal
+      });
+      if (!response.ok) {
+        return null;
+      }
+      const result = await response.json();
+      this.debugLog(`Relais préchauffé en ${Date.now() - start}ms`, result);
+      return result;
+    } catch (error) {
+      this.debugLog(`Erreur lors du préchauffage du relais: ${error.message}`);
+      return null;
+    } finally {
+      clearTimeout(timer);
+    }
+  }
 }
 
 export { RelayClient };
@@ -131,6 +131,53 @@ class ScrapingMonitor {
     }
   }
 
+  /**
+   * Enregistre les durées par étape du scraping d'une source dans scraping_logs
+   * (une ligne par source, relue par scripts/scraping_report.py)
+   * @param {string} scrapingId - L'identifiant de la session
+   * @param {string} source - La source scrapée
+   * @param {string} contentType - Le type de contenu de la source
+   * @param {Object} result - Le résultat du scraping
+   * @param {Object} timings - Les durées par étape (ScrapingSpans.summary())
+   */
+  async logSourceTimings(scrapingId, source, contentType, result, timings) {
+    this.debugLog(`Enregistrement des durées pour la source ${source} (ID: ${scrapingId})`, timings);
+    
+    if (this.env.DB) {
+      try {
+        await this.env.DB.prepare(`
+          INSERT INTO scraping_logs (
+            id,
+            source,
+            content_type,
+            status,
+            items_count,
+            errors_count,
+            duration,
+            success,
+            details,
+            created_at
+          ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        `).bind(
+          `${scrapingId}_${source}`,
+          source,
+          contentType,
+          result.success ? 'completed' : 'failed',
+          result.items_count || 0,
+          result.errors_count || 0,
+          Math.round(timings.wall_ms),
+          result.success ? 1 : 0,
+          JSON.stringify({ scraping_id: scrapingId, timings }),
+          new Date().toISOString()
+        ).run();
+        
+        this.debugLog(`Durées pour la source ${source} enregistrées dans la base de données (ID: ${scrapingId})`);
+      } catch (error) {
+        console.error(`Erreur lors de l'enregistrement des durées pour la source ${source}: ${error.message}`);
+      }
+    }
+  }
+
   /**
    * Enregistre le début d'une opération de scraping
    * @param {string} source - La source à scraper
@@ -0,0 +1,144 @@
+/**
+ * Mesure du temps passé par étape dans une session de scraping
+ *
+ * Les durées sont agrégées en mémoire dans des histogrammes logarithmiques,
+ * au même format que scripts/scraping_spans.py (fusionnables d'une session
+ * à l'autre), puis écrites par ScrapingMonitor dans le champ details de
+ * scraping_logs, où scripts/scraping_report.py les relit.
+ *
+ * Dans un Worker, l'horloge n'avance qu'entre deux entrées/sorties : les
+ * étapes sans réseau (analyse du HTML) y restent proches de zéro, seules
+ * fetch et store (écriture dans D1) y sont réellement mesurées. Les étapes
+ * d'import (validate, copy, merge) sont mesurées par scripts/bulk_ingest.py.
+ */
+
+// Précision des histogrammes : 8 seaux par puissance de 2 (~9% d'erreur)
+const BUCKETS_PER_OCTAVE = 8;
+
+/**
+ * Retourne l'indice du seau d'histogramme pour une durée en millisecondes
+ * @param {number} durationMs - Durée en millisecondes
+ * @returns {number} - Indice du seau
+ */
+function bucketIndex(durationMs) {
+  if (durationMs <= 1) {
+    return 0;
+  }
+  return Math.ceil(Math.log2(durationMs) * BUCKETS_PER_OCTAVE);
+}
+
+/**
+ * Calcule un percentile (0-100) à partir d'un histogramme { indice: nombre }
+ * @param {Object} histogram - Histogramme
+ * @param {number} percentile - Percentile recherché
+ * @returns {number|null} - Borne haute du seau en millisecondes
+ */
+function histogramPercentile(histogram, percentile) {
+  const buckets = Object.entries(histogram)
+    .map(([index, count]) => [parseInt(index, 10), count])
+    .sort((a, b) => a[0] - b[0]);
+  const total = buckets.reduce((sum, [, count]) => sum + count, 0);
+  if (!total) {
+    return null;
+  }
+  const rank = percentile / 100 * total;
+  let seen = 0;
+  for (const [index, count] of buckets) {
+    seen += count;
+    if (seen >= rank) {
+      return 2 ** (index / BUCKETS_PER_OCTAVE);
+    }
+  }
+  return 2 ** (buckets[buckets.length - 1][0] / BUCKETS_PER_OCTAVE);
+}
+
+class ScrapingSpans {
+  /**
+   * Collecteur de durées par étape pour une source
+   * @param {string} source - La source scrapée
+   */
+  constructor(source) {
+    this.source = source;
+    this.stages = {};
+    this.startedAt = Date.now();
+  }
+
+  /**
+   * Exécute une fonction asynchrone et attribue sa durée à l'étape donnée
+   * @param {string} stage - L'étape (fetch, parse, normalize, validate, store)
+   * @param {Function} fn - La fonction à mesurer
+   * @returns {Promise<*>} - Le résultat de la fonction
+   */
+  async span(stage, fn) {
+    const start = Date.now();
+    try {
+      return await fn();
+    } finally {
+      this.record(stage, Date.now() - start);
+    }
+  }
+
+  /**
+   * Mesure tous les appels à une méthode d'un objet (ex. fetchHtml d'un scraper)
+   * @param {Object} target - L'objet dont la méthode est mesurée
+   * @param {string} method - Le nom de la méthode
+   * @param {string} stage - L'étape à laquelle attribuer les appels
+   */
+  wrap(target, method, stage) {
+    const original = target[method].bind(target);
+    target[method] = (...args) => this.span(stage, () => original(...args));
+  }
+
+  /**
+   * Enregistre une durée pour une étape
+   * @param {string} stage - L'étape
+   * @param {number} durationMs - Durée en millisecondes
+   */
+  record(stage, durationMs) {
+    const stats = this.stages[stage] || (this.stages[stage] = {
+      count: 0,
+      total_ms: 0,
+      max_ms: 0,
+      histogram: {}
+    });
+    const index = bucketIndex(durationMs);
+    stats.count += 1;
+    stats.total_ms += durationMs;
+    stats.max_ms = Math.max(stats.max_ms, durationMs);
+    stats.histogram[index] = (stats.histogram[index] || 0) + 1;
+  }
+
+  /**
+   * Durée totale enregistrée pour une étape
+   * @param {string} stage - L'étape
+   * @returns {number} - Durée en millisecondes
+   */
+  totalMs(stage) {
+    return this.stages[stage] ? this.stages[stage].total_ms : 0;
+  }
+
+  /**
+   * Statistiques agrégées, prêtes à être sérialisées en JSON
+   * @returns {Object} - { source, wall_ms, stages }
+   */
+  summary() {
+    const stages = {};
+    for (const [stage, stats] of Object.entries(this.stages)) {
+      stages[stage] = {
+        count: stats.count,
+        total_ms: stats.total_ms,
+        max_ms: stats.max_ms,
+        p50_ms: histogramPercentile(stats.histogram, 50),
+        p95_ms: histogramPercentile(stats.histogram, 95),
+        histogram: { ...stats.histogram }
+      };
+    }
+    return {
+      source: this.source,
+      wall_ms: Date.now() - this.startedAt,
+      stages
+    };
+  }
+}
+
+export { ScrapingSpans };
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Import en masse des dumps de scraping dans Supabase via PostgreSQL
+
+Ce script remplace l'insertion ligne par ligne via l'API REST :
+- le schéma des tables cibles est lu une seule fois dans information_schema
+  puis mis en cache sur disque (scripts/.schema_cache.json)
+- chaque enregistrement est validé et converti localement contre ce schéma,
+  avant toute connexion réseau (poster_url au lieu de poster, etc.)
+- les lignes sont envoyées dans une table temporaire avec COPY FROM STDIN
+- la table temporaire est fusionnée dans la table cible en un UPDATE et un
+  INSERT ensemblistes, sans écraser les champs absents des enregistrements
+- la durée des étapes (validate, copy, merge) est affichée par table en fin d'import
+
+Usage : python scripts/bulk_ingest.py <dump.json> [<dump.json> ...]
+        [--dry-run] [--refresh-schema] [--skip-invalid]
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime
+
+import psycopg2
+from dotenv import load_dotenv
+
+from scraping_spans import StageTimings
+
+# Chargement des variables d'environnement
+load_dotenv()
+
+# Configuration PostgreSQL
+POSTGRES_URL = os.getenv('POSTGRES_URL')
+
+# Fichier de cache du schéma (évite une introspection à chaque import)
+SCHEMA_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".schema_cache.json")
+
+# Correspondance type de contenu -> table Supabase
+CONTENT_TABLES = {
+    "drama": "dramas",
+    "anime": "animes",
+    "film": "films",
+    "movie": "films",
+    "bollywood": "bollywood",
+}
+
+# Table des sources dont les dumps ne précisent pas le type de contenu
+SOURCE_TABLES = {
+    "voiranime": "animes", "animesama": "animes", "animevostfr": "animes",
+    "nekosama": "animes", "otakufr": "animes",
+    "voirdrama": "dramas", "dramavostfr": "dramas", "dramacool": "dramas",
+    "dramacore": "dramas", "mydramalist": "dramas", "asianwiki": "dramas",
+    "vostfree": "films", "filmapik": "films", "filmcomplet": "films",
+    "streamingdivx": "films", "streamingcommunity": "films",
+    "bollyplay": "bollywood", "hindilinks4u": "bollywood",
+}
+
+# Anciens noms de champs encore produits par certains scrapers
+FIELD_ALIASES = {
+    "poster_url": "poster",
+    "backdrop_url": "backdrop",
+    "episodes": "episodes_count",
+    "url": "source_url",
+}
+
+# Champs propres au format des dumps, jamais stockés tels quels
+IGNORED_FIELDS = {"content_type"}
+
+INTEGER_TYPES = {"smallint", "integer", "bigint"}
+FLOAT_TYPES = {"real", "double precision", "numeric"}
+TIMESTAMP_TYPES = {"timestamp with time zone", "timestamp without time zone", "date"}
+
+TRUE_VALUES = {"1", "true", "yes", "oui"}
+FALSE_VALUES = {"0", "false", "no", "non"}
+
+
+def load_schema(tables, refresh=False):
+    """
+    Retourne le schéma des tables demandées sous la forme
+    {table: {colonne: {"type", "udt", "nullable", "default"}}}
+
+    Le cache disque est utilisé tant qu'il couvre toutes les tables ;
+    sinon une seule requête information_schema est faite pour toutes.
+    """
+    cache = {}
+    if os.path.exists(SCHEMA_CACHE_FILE):
+        with open(SCHEMA_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+
+    missing = [t for t in tables if t not in cache]
+    if not refresh and not missing:
+        return {t: cache[t] for t in tables}
+
+    to_fetch = list(tables) if refresh else missing
+    print(f"🔍 Introspection du schéma: {', '.join(to_fetch)}")
+    conn = psycopg2.connect(POSTGRES_URL)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT table_name, column_name, data_type, udt_name, is_nullable, column_default
+                FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = ANY(%s)
+                ORDER BY table_name, ordinal_position
+            """, (to_fetch,))
+            for table in to_fetch:
+                cache[table] = {}
+            for table, name, data_type, udt_name, is_nullable, column_default in cursor.fetchall():
+                cache[table][name] = {
+                    "type": data_type,
+                    "udt": udt_name,
+                    "nullable": is_nullable == "YES",
+                    "default": column_default,
+                }
+    finally:
+        conn.close()
+
+    with open(SCHEMA_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+    return {t: cache[t] for t in tables}
+
+
+def coerce_value(value, column):
+    """Convertit une valeur Python vers le type PostgreSQL de la colonne"""
+    if value is None or value == "":
+        return None
+
+    data_type = column["type"]
+    if data_type in INTEGER_TYPES:
+        if isinstance(value, bool):
+            raise ValueError("booléen pour une colonne entière")
+        number = float(value)
+        if not number.is_integer():
+            # "12.7" ne doit pas devenir 12 sans erreur
+            raise ValueError("valeur non entière")
+        return int(number)
+    if data_type in FLOAT_TYPES:
+        if isinstance(value, bool):
+            raise ValueError("booléen pour une colonne numérique")
+        return float(value)
+    if data_type == "boolean":
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValueError("valeur booléenne non reconnue")
+    if data_type == "uuid":
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            # Identifiant de scraper (ex: voirdrama_60d3f4222308) : UUID stable
+            return str(uuid.uuid5(uuid.NAMESPACE_URL, str(value)))
+    if data_type == "ARRAY":
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, (list, tuple)):
+            raise ValueError("liste attendue")
+        if any(v is None or isinstance(v, (list, dict)) for v in value):
+            raise ValueError("élément de liste invalide")
+        return [str(v) for v in value]
+    if data_type in ("json", "jsonb"):
+        return value
+    if data_type in TIMESTAMP_TYPES:
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if not isinstance(value, str):
+            raise ValueError("date attendue au format ISO 8601")
+        text = value.strip().replace("Z", "+00:00")
+        if data_type == "date":
+            return date.fromisoformat(text[:10] if "T" in text else text).isoformat()
+        return datetime.fromisoformat(text).isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def validate_record(record, columns):
+    """
+    Valide et convertit un enregistrement contre le schéma en cache.
+    Retourne (ligne convertie, liste d'erreurs).
+
+    Un enregistrement doit toujours pouvoir être inséré : les colonnes
+    NOT NULL sans valeur par défaut sont exigées, même si la ligne existe
+    déjà (l'existence n'est connue qu'une fois connecté à la base).
+    """
+    row = {}
+    errors = []
+
+    for field, value in record.items():
+        if field in IGNORED_FIELDS:
+            continue
+        name = field if field in columns else FIELD_ALIASES.get(field)
+        if name not in columns:
+            errors.append(f"Colonne inconnue : {field}")
+            continue
+        if name in row and name != field:
+            # Le nom correct est prioritaire sur l'alias
+            continue
+        try:
+            row[name] = coerce_value(value, columns[name])
+        except (TypeError, ValueError):
+            errors.append(f"Valeur invalide pour {name} ({columns[name]['type']}) : {value!r}")
+
+    for name, column in columns.items():
+        if not column["nullable"] and column["default"] is None and row.get(name) is None:
+            errors.append(f"Champ obligatoire manquant : {name}")
+
+    return row, errors
+
+
+def format_copy_value(value, column):
+    """Formate une valeur pour le format CSV de COPY"""
+    if value is None:
+        return None
+    if column["type"] == "ARRAY":
+        items = ['"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in value]
+        return "{" + ",".join(items) + "}"
+    if column["type"] in ("json", "jsonb"):
+        return json.dumps(value, ensure_ascii=False)
+    if column["type"] == "boolean":
+        return "true" if value else "false"
+    return value
+
+
+class CopyStream(io.RawIOBase):
+    """Flux en lecture seule qui génère le CSV à la demande pour COPY FROM STDIN"""
+
+    def __init__(self, rows, column_names, columns):
+        self._lines = self._generate(rows, column_names, columns)
+        self._buffer = b""
+
+    @staticmethod
+    def _generate(rows, column_names, columns):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        for row in rows:
+            values = [format_copy_value(row.get(name), columns[name]) for name in column_names]
+            # None -> champ vide non quoté, interprété comme NULL par COPY
+            writer.writerow(["" if v is None else v for v in values])
+            line = output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            yield line.encode("utf-8")
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while len(self._buffer) < len(buffer):
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def bulk_upsert(conn, table, rows, columns, timings=None):
+    """
+    Envoie les lignes dans une table temporaire via COPY puis les fusionne
+    dans la table cible : un UPDATE pour les lignes existantes, un INSERT
+    pour les nouvelles, tous deux ensemblistes. Les durées des étapes copy
+    et merge sont ajoutées à timings (StageTimings) s'il est fourni.
+    """
+    timings = timings or StageTimings(table)
+
+    # Un même id présent dans plusieurs dumps : la dernière occurrence gagne
+    unique_rows = {}
+    for row in rows:
+        if row.get("id") is None:
+            raise ValueError(f"Les enregistrements pour {table} doivent avoir un champ id")
+        unique_rows[row["id"]] = row
+
+    column_names = [name for name in columns if any(name in row for row in unique_rows.values())]
+    staging = f"staging_{table}"
+    quoted = ", ".join(f'"{name}"' for name in column_names)
+
+    # Insertion : les valeurs absentes prennent la valeur par défaut de la table cible
+    selected = []
+    for name in column_names:
+        default = columns[name]["default"]
+        selected.append(f's."{name}"' if not default else f'COALESCE(s."{name}", {default})')
+
+    # Mise à jour : une valeur absente d'un enregistrement ne remplace jamais
+    # la valeur existante (ni par NULL, ni par la valeur par défaut)
+    updates = ", ".join(
+        f'"{name}" = COALESCE(s."{name}", t."{name}")'
+        for name in column_names if name not in ("id", "created_at")
+    )
+
+    with conn.cursor() as cursor, timings.span("copy"):
+        cursor.execute(f'CREATE TEMP TABLE "{staging}" (LIKE "{table}") ON COMMIT DROP')
+        # Les colonnes absentes d'une partie du lot restent NULL dans la table
+        # temporaire : la valeur existante ou la valeur par défaut est appliquée
+        # à la fusion (les colonnes obligatoires sans défaut sont exigées par
+        # validate_record)
+        for name, column in columns.items():
+            if not column["nullable"]:
+                cursor.execute(f'ALTER TABLE "{staging}" ALTER COLUMN "{name}" DROP NOT NULL')
+
+        stream = io.BufferedReader(CopyStream(unique_rows.values(), column_names, columns))
+        cursor.copy_expert(f'COPY "{staging}" ({quoted}) FROM STDIN WITH (FORMAT csv)', stream)
+
+    with conn.cursor() as cursor, timings.span("merge"):
+        count = 0
+        if updates:
+            cursor.execute(f"""
+                UPDATE "{table}" AS t SET {updates}
+                FROM "{staging}" AS s
+                WHERE t.id = s.id
+            """)
+            count += cursor.rowcount
+
+        cursor.execute(f"""
+            INSERT INTO "{table}" ({quoted})
+            SELECT {", ".join(selected)} FROM "{staging}" AS s
+            WHERE NOT EXISTS (SELECT 1 FROM "{table}" AS t WHERE t.id = s.id)
+            ON CONFLICT (id) DO NOTHING
+        """)
+        return count + cursor.rowcount
+
+
+def print_timings(timings):
+    """Affiche la durée de chaque étape par table"""
+    print(f"\n{'Table':<12} {'Étape':<10} {'Durée (ms)':>12}")
+    for table, table_timings in timings.items():
+        for stage, stats in table_timings.summary()["stages"].items():
+            print(f"{table:<12} {stage:<10} {stats['total_ms']:>12.1f}")
+
+
+def import_record_table(path):
+    """
+    Table cible enregistrée pour un dump par send-to-d1.js
+    (fichier d1_import_<dump>.json à côté du dump), ou None
+    """
+    record_path = os.path.join(os.path.dirname(path), f"d1_import_{os.path.basename(path)}")
+    if not os.path.exists(record_path):
+        return None
+    with open(record_path, "r", encoding="utf-8") as f:
+        return json.load(f).get("table")
+
+
+def load_dump(path):
+    """
+    Charge un fichier de dump converti (format {source, data: [...]}) ou une liste brute.
+    Retourne (table cible du fichier ou None, enregistrements).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        return None, data
+    table = (
+        data.get("table")
+        or import_record_table(path)
+        or CONTENT_TABLES.get(data.get("content_type"))
+    )
+    return table, data.get("data", [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import en masse des dumps de scraping dans Supabase")
+    parser.add_argument("dumps", nargs="+", help="Fichiers JSON à importer")
+    parser.add_argument("--dry-run", action="store_true", help="Valider sans écrire en base")
+    parser.add_argument("--refresh-schema", action="store_true", help="Relire le schéma depuis la base")
+    parser.add_argument("--skip-invalid", action="store_true", help="Ignorer les enregistrements invalides au lieu d'abandonner")
+    args = parser.parse_args()
+
+    # Regroupement des enregistrements par table cible
+    records = {}
+    for path in args.dumps:
+        file_table, items = load_dump(path)
+        # Sans table pour le fichier (dump multi-sources), chaque enregistrement
+        # est routé selon son content_type, sinon selon sa source (préfixe de l'id)
+        skipped = Counter()
+        for item in items:
+            source = item.get("source") or str(item.get("id", "")).split("_")[0]
+            table = file_table or CONTENT_TABLES.get(item.get("content_type")) or SOURCE_TABLES.get(source)
+            if not table:
+                skipped[item.get("content_type")] += 1
+                continue
+            records.setdefault(table, []).append(item)
+        if skipped:
+            details = ", ".join(f"{content_type}: {count}" for content_type, count in skipped.most_common())
+            print(f"⚠️ {path}: {sum(skipped.values())} enregistrements ignorés, type de contenu et source inconnus ({details})")
+
+    if not records:
+        print("❌ Aucun enregistrement à importer")
+        return 1
+
+    schema = load_schema(sorted(records), refresh=args.refresh_schema)
+
+    # Validation locale complète avant toute écriture
+    rows = {}
+    timings = {}
+    invalid = 0
+    for table, items in records.items():
+        if not schema[table]:
+            print(f"❌ Table {table} introuvable dans le schéma")
+            return 1
+        rows[table] = []
+        timings[table] = StageTimings(table)
+        with timings[table].span("validate"):
+            for item in items:
+                row, errors = validate_record(item, schema[table])
+                if errors:
+                    invalid += 1
+                    print(f"[KO] {table} id={item.get('id', '?')} :")
+                    for err in errors:
+                        print(f"   - {err}")
+                    continue
+                rows[table].append(row)
+
+    total = sum(len(items) for items in records.values())
+    print(f"\nValidation terminée : {total - invalid}/{total} enregistrements OK.")
+    if invalid and not args.skip_invalid:
+        print("❌ Import annulé (utilisez --skip-invalid pour ignorer les enregistrements invalides)")
+        return 1
+    if args.dry_run:
+        print_timings(timings)
+        return 0
+
+    conn = psycopg2.connect(POSTGRES_URL)
+    try:
+        for table, table_rows in rows.items():
+            if not table_rows:
+                continue
+            start_time = time.time()
+            count = bulk_upsert(conn, table, table_rows, schema[table], timings[table])
+            with timings[table].span("commit"):
+                conn.commit()
+            elapsed = time.time() - start_time
+            print(f"✅ {table}: {count} lignes fusionnées en {elapsed:.2f}s")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Erreur lors de l'import: {str(e)}")
+        return 1
+    finally:
+        conn.close()
+
+    print_timings(timings)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
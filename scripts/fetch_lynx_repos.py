@@ -1,69 +1,199 @@
 import requests
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-def fetch_lynx_repos():
+# URL de l'API GitHub (surchargeable pour tester contre une API locale)
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+# Nombre maximum de requêtes simultanées
+MAX_WORKERS = int(os.getenv("GITHUB_MAX_WORKERS", "8"))
+
+# En dessous de ce nombre de requêtes restantes, on attend la remise à zéro
+RATE_LIMIT_THRESHOLD = int(os.getenv("GITHUB_RATE_LIMIT_THRESHOLD", "10"))
+
+
+class GitHubClient:
+    """
+    Client GitHub minimal avec :
+    - cache ETag / Last-Modified sur disque (les 304 ne consomment pas de quota)
+    - pagination via l'en-tête Link
+    - attente automatique quand X-RateLimit-Remaining devient trop bas
+    - attente de Retry-After sur les limites secondaires (403/429)
+    """
+
+    def __init__(self, api_url=GITHUB_API_URL, cache_file=None, token=None):
+        self.api_url = api_url.rstrip("/")
+        self.cache_file = cache_file
+        self.session = requests.Session()
+        self.session.headers["Accept"] = "application/vnd.github.v3+json"
+        token = token or os.getenv("GITHUB_TOKEN")
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+        self._lock = threading.Lock()
+        self._paused_until = 0
+        self.stats = {"requests": 0, "not_modified": 0}
+
+        self.cache = {}
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+
+    def save_cache(self):
+        """Sauvegarde le cache ETag sur disque"""
+        if not self.cache_file:
+            return
+        with self._lock:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f, ensure_ascii=False)
+
+    def _wait_for_rate_limit(self):
+        with self._lock:
+            delay = self._paused_until - time.time()
+        if delay > 0:
+            print(f"Limite de requêtes atteinte, attente de {delay:.0f}s...")
+            time.sleep(delay)
+
+    def _pause(self, seconds):
+        """Suspend toutes les requêtes pendant seconds secondes"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.time() + seconds)
+
+    def _update_rate_limit(self, response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        if int(remaining) <= RATE_LIMIT_THRESHOLD:
+            with self._lock:
+                self._paused_until = max(self._paused_until, int(reset) + 1)
+
+    def get(self, url):
+        """
+        Effectue un GET conditionnel et retourne (corps JSON, liens de pagination).
+        Le corps et les liens sont relus depuis le cache quand l'API répond 304.
+        """
+        if not url.startswith("http"):
+            url = f"{self.api_url}{url}"
+
+        while True:
+            self._wait_for_rate_limit()
+
+            headers = {}
+            cached = self.cache.get(url)
+            if cached:
+                if cached.get("etag"):
+                    headers["If-None-Match"] = cached["etag"]
+                if cached.get("last_modified"):
+                    headers["If-Modified-Since"] = cached["last_modified"]
+
+            response = self.session.get(url, headers=headers, timeout=30)
+            with self._lock:
+                self.stats["requests"] += 1
+            self._update_rate_limit(response)
+
+            # Quota épuisé : on attend la remise à zéro puis on réessaie
+            if response.status_code in (403, 429) and response.headers.get("X-RateLimit-Remaining") == "0":
+                if "X-RateLimit-Reset" not in response.headers:
+                    self._pause(int(response.headers.get("Retry-After", "60")))
+                continue
+
+            # Limite secondaire (trop de requêtes simultanées ou rapprochées) alors
+            # que le quota n'est pas épuisé : Retry-After, ou une minute pour un 429
+            if response.status_code in (403, 429) and (
+                "Retry-After" in response.headers or response.status_code == 429
+            ):
+                self._pause(int(response.headers.get("Retry-After", "60")))
+                continue
+
+            if response.status_code == 304 and cached:
+                with self._lock:
+                    self.stats["not_modified"] += 1
+                return cached["body"], cached.get("links", {})
+
+            response.raise_for_status()
+            body = response.json()
+            links = {rel: link["url"] for rel, link in response.links.items()}
+            if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+                with self._lock:
+                    self.cache[url] = {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "body": body,
+                        "links": links,
+                    }
+            return body, links
+
+    def get_paginated(self, url):
+        """Récupère toutes les pages d'une liste en suivant l'en-tête Link"""
+        items = []
+        while url:
+            body, links = self.get(url)
+            items.extend(body)
+            url = links.get("next")
+        return items
+
+
+def fetch_lynx_repos(api_url=GITHUB_API_URL, max_workers=MAX_WORKERS):
     """
     Récupère tous les repos de l'organisation lynx-family sur GitHub
     et sauvegarde les informations dans un fichier JSON
     """
     # Configuration
     org_name = "lynx-family"
-    api_url = f"https://api.github.com/orgs/{org_name}/repos"
-    headers = {
-        "Accept": "application/vnd.github.v3+json"
-    }
+
+    # Création du dossier de données s'il n'existe pas
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+    os.makedirs(data_dir, exist_ok=True)
+
+    client = GitHubClient(api_url, cache_file=os.path.join(data_dir, ".github_cache.json"))
 
     try:
-        # Récupération des repos
+        # Récupération des repos (toutes les pages)
         print(f"Récupération des repos de {org_name}...")
-        response = requests.get(api_url, headers=headers)
-        response.raise_for_status()
-        repos = response.json()
-
-        # Création du dossier de données s'il n'existe pas
-        data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-        os.makedirs(data_dir, exist_ok=True)
-
-        # Préparation des données
-        repos_data = []
-        for repo in repos:
-            # Récupération des informations détaillées du repo
-            repo_url = repo["url"]
-            repo_response = requests.get(repo_url, headers=headers)
-            repo_response.raise_for_status()
-            repo_details = repo_response.json()
-
-            # Récupération du README
-            readme_url = f"https://api.github.com/repos/{org_name}/{repo['name']}/readme"
-            try:
-                readme_response = requests.get(readme_url, headers=headers)
-                readme_response.raise_for_status()
-                readme_content = readme_response.json()["content"]
-            except:
-                readme_content = ""
-
-            # Structure des données
-            repo_info = {
-                "name": repo["name"],
-                "full_name": repo["full_name"],
-                "description": repo["description"],
-                "html_url": repo["html_url"],
-                "clone_url": repo["clone_url"],
-                "created_at": repo["created_at"],
-                "updated_at": repo["updated_at"],
-                "language": repo["language"],
-                "topics": repo_details.get("topics", []),
-                "readme": readme_content,
-                "default_branch": repo["default_branch"],
-                "is_template": repo.get("is_template", False),
-                "dependencies": {
-                    "package_json": get_package_json(org_name, repo["name"], repo["default_branch"]),
+        repos = client.get_paginated(f"/orgs/{org_name}/repos?per_page=100")
+
+        # Les détails, README et package.json de chaque repo sont récupérés en parallèle
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (
+                    repo,
+                    executor.submit(client.get, repo["url"]),
+                    executor.submit(get_readme, client, org_name, repo["name"]),
+                    executor.submit(get_package_json, client, org_name, repo["name"], repo["default_branch"]),
+                )
+                for repo in repos
+            ]
+
+            # Préparation des données
+            repos_data = []
+            for repo, details_future, readme_future, package_future in futures:
+                repo_details, _ = details_future.result()
+
+                # Structure des données
+                repo_info = {
+                    "name": repo["name"],
+                    "full_name": repo["full_name"],
+                    "description": repo["description"],
+                    "html_url": repo["html_url"],
+                    "clone_url": repo["clone_url"],
+                    "created_at": repo["created_at"],
+                    "updated_at": repo["updated_at"],
+                    "language": repo["language"],
+                    "topics": repo_details.get("topics", []),
+                    "readme": readme_future.result(),
+                    "default_branch": repo["default_branch"],
+                    "is_template": repo.get("is_template", False),
+                    "dependencies": {
+                        "package_json": package_future.result(),
+                    }
                 }
-            }
-            repos_data.append(repo_info)
-            print(f"Informations récupérées pour {repo['name']}")
+                repos_data.append(repo_info)
+                print(f"Informations récupérées pour {repo['name']}")
 
         # Sauvegarde des données
         output_file = os.path.join(data_dir, "lynx_repos.json")
@@ -74,27 +204,34 @@ def fetch_lynx_repos():
             }, f, ensure_ascii=False, indent=2)
 
         print(f"\nDonnées sauvegardées dans {output_file}")
+        print(f"Requêtes effectuées: {client.stats['requests']} (dont {client.stats['not_modified']} non modifiées)")
         return True
 
     except Exception as e:
         print(f"Erreur lors de la récupération des repos: {str(e)}")
         return False
 
-def get_package_json(org_name, repo_name, branch):
+    finally:
+        client.save_cache()
+
+def get_readme(client, org_name, repo_name):
     """
-    Récupère le contenu du package.json s'il existe
+    Récupère le contenu (base64) du README s'il existe
     """
-    url = f"https://api.github.com/repos/{org_name}/{repo_name}/contents/package.json?ref={branch}"
-    headers = {
-        "Accept": "application/vnd.github.v3+json"
-    }
+    try:
+        body, _ = client.get(f"/repos/{org_name}/{repo_name}/readme")
+        return body["content"]
+    except Exception:
+        return ""
 
+def get_package_json(client, org_name, repo_name, branch):
+    """
+    Récupère le contenu du package.json s'il existe
+    """
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        content = response.json()["content"]
-        return content
-    except:
+        body, _ = client.get(f"/repos/{org_name}/{repo_name}/contents/package.json?ref={branch}")
+        return body["content"]
+    except Exception:
         return None
 
 if __name__ == "__main__":
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pipeline d'images pour FloDrama (posters, backdrops, vignettes)
+
+Pour chaque dump de scraping :
+- les images distantes (poster, backdrop, image_url, images.thumbnail...)
+  sont téléchargées en parallèle, avec une concurrence bornée (les URLs
+  du stockage Supabase, déjà réécrites par une exécution précédente, sont ignorées)
+- elles sont dédupliquées par empreinte SHA-256 du contenu : un même poster
+  présent sur plusieurs sources n'est traité et stocké qu'une fois
+- les variantes WebP (et AVIF si pillow-avif-plugin est installé) sont générées dans un pool
+  de processus, à plusieurs largeurs
+- seules les variantes absentes du bucket Supabase sont envoyées
+- les champs image des enregistrements sont réécrits vers la variante par défaut
+
+Les variantes sont stockées sous images/<hash>/<largeur>.<format> : le
+frontend peut construire un srcset en remplaçant la largeur dans l'URL.
+
+Usage : python scripts/image_pipeline.py <dump.json> [<dump.json> ...]
+        [--in-place] [--workers 16] [--processes 4] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import requests
+from dotenv import load_dotenv
+from PIL import Image, features
+
+try:
+    # Greffon AVIF pour les versions de Pillow qui ne le gèrent pas nativement
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+# Chargement des variables d'environnement
+load_dotenv()
+
+# Configuration Supabase
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+BUCKET_NAME = os.getenv('SUPABASE_STORAGE_BUCKET', 'flodrama-images')
+
+# Manifeste local : URL source -> empreinte, empreinte -> variantes envoyées
+MANIFEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".image_manifest.json")
+
+# Largeurs générées par type d'image et largeur utilisée dans les enregistrements
+VARIANT_WIDTHS = {
+    "poster": (185, 342, 500),
+    "backdrop": (780, 1280),
+    "thumbnail": (120, 240),
+}
+DEFAULT_WIDTH = {"poster": 342, "backdrop": 1280, "thumbnail": 240}
+
+# Champs image des enregistrements et type d'image associé
+IMAGE_FIELDS = {
+    "poster": "poster",
+    "image_url": "poster",
+    "backdrop": "backdrop",
+    "thumbnail": "thumbnail",
+}
+
+FORMATS = ["webp"] + (["avif"] if features.check("avif") else [])
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36'
+
+
+def load_manifest():
+    """Charge le manifeste des images déjà traitées"""
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"urls": {}, "uploaded": {}}
+
+
+def save_manifest(manifest):
+    """Sauvegarde le manifeste des images traitées"""
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+
+def iter_image_fields(record):
+    """Retourne [(conteneur, champ, type d'image)] pour les images distantes d'un enregistrement"""
+    found = []
+    for container in (record, record.get("images") if isinstance(record.get("images"), dict) else None):
+        if not container:
+            continue
+        for field, kind in IMAGE_FIELDS.items():
+            value = container.get(field)
+            if not isinstance(value, str) or not value.startswith(("http://", "https://")):
+                continue
+            # Variantes déjà générées par une exécution précédente
+            if SUPABASE_URL and value.startswith(f"{SUPABASE_URL}/storage/"):
+                continue
+            found.append((container, field, kind))
+    return found
+
+
+def variant_path(digest, width, image_format):
+    """Chemin d'une variante dans le bucket"""
+    return f"images/{digest}/{width}.{image_format}"
+
+
+def missing_widths(manifest, digest, widths):
+    """Largeurs dont au moins un format n'a pas encore été envoyé pour cette empreinte"""
+    done = set(manifest["uploaded"].get(digest, []))
+    return sorted(w for w in widths if not all(variant_path(digest, w, f) in done for f in FORMATS))
+
+
+def public_url(path):
+    """URL publique d'un objet du bucket"""
+    return f"{SUPABASE_URL}/storage/v1/object/public/{BUCKET_NAME}/{path}"
+
+
+def download(session, url):
+    """Télécharge une image et retourne son contenu, ou None en cas d'échec"""
+    try:
+        response = session.get(url, timeout=20)
+        response.raise_for_status()
+        if not response.headers.get("Content-Type", "image/").startswith("image/"):
+            return None
+        return response.content
+    except requests.RequestException:
+        return None
+
+
+def render_variants(digest, content, widths):
+    """
+    Génère les variantes d'une image (exécuté dans un processus séparé).
+    Retourne {chemin: (octets, type MIME)}.
+    """
+    variants = {}
+    with Image.open(io.BytesIO(content)) as image:
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for width in widths:
+            # Pas d'agrandissement : la variante garde la largeur d'origine
+            target_width = min(width, image.width)
+            height = round(image.height * target_width / image.width)
+            resized = image.resize((target_width, height), Image.LANCZOS)
+            for image_format in FORMATS:
+                output = io.BytesIO()
+                resized.save(output, format=image_format.upper(), quality=80)
+                variants[variant_path(digest, width, image_format)] = (output.getvalue(), f"image/{image_format}")
+    return variants
+
+
+def upload(session, path, data, content_type):
+    """Envoie une variante dans le bucket ; un objet déjà présent est considéré comme envoyé"""
+    response = session.post(
+        f"{SUPABASE_URL}/storage/v1/object/{BUCKET_NAME}/{path}",
+        data=data,
+        headers={
+            "Authorization": f"Bearer {SUPABASE_KEY}",
+            "apikey": SUPABASE_KEY,
+            "Content-Type": content_type,
+            "Cache-Control": "max-age=31536000",
+            "x-upsert": "false",
+        },
+        timeout=30
+    )
+    # 409 / 400 "Duplicate" : l'objet existe déjà
+    if response.status_code in (400, 409) and "Duplicate" in response.text:
+        return True
+    return response.ok
+
+
+def process_dumps(paths, workers=16, processes=4, dry_run=False):
+    """Traite les images de plusieurs dumps et retourne {chemin: données réécrites}"""
+    manifest = load_manifest()
+    lock = threading.Lock()
+    stats = {"urls": 0, "downloaded": 0, "duplicates": 0, "failed": 0, "uploaded": 0}
+
+    dumps = {}
+    wanted = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            dumps[path] = json.load(f)
+        records = dumps[path]["data"] if isinstance(dumps[path], dict) else dumps[path]
+        for record in records:
+            for container, field, kind in iter_image_fields(record):
+                wanted.setdefault(container[field], set()).add(kind)
+    stats["urls"] = len(wanted)
+
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # Largeurs nécessaires par URL (une image peut servir de poster et de vignette)
+    required = {url: {w for kind in kinds for w in VARIANT_WIDTHS[kind]} for url, kinds in wanted.items()}
+
+    # 1. Téléchargement des images jamais vues ou dont des variantes manquent
+    # (rendu ou envoi précédent en échec, nouveau type d'image), dédupliquées par contenu
+    contents = {}
+    to_download = [
+        url for url, widths in required.items()
+        if url not in manifest["urls"] or missing_widths(manifest, manifest["urls"][url], widths)
+    ]
+
+    def fetch(url):
+        content = download(session, url)
+        with lock:
+            if content is None:
+                stats["failed"] += 1
+                return
+            stats["downloaded"] += 1
+            digest = hashlib.sha256(content).hexdigest()
+            previous = manifest["urls"].get(url)
+            manifest["urls"][url] = digest
+            if digest in contents or (digest in manifest["uploaded"] and digest != previous):
+                stats["duplicates"] += 1
+            contents.setdefault(digest, content)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, to_download))
+
+    # Largeurs nécessaires par empreinte
+    needed = {}
+    for url, widths in required.items():
+        digest = manifest["urls"].get(url)
+        if digest:
+            needed.setdefault(digest, set()).update(widths)
+
+    # 2. Génération des variantes manquantes dans un pool de processus
+    # 3. Envoi des nouvelles variantes, en parallèle du rendu des suivantes
+    with ProcessPoolExecutor(max_workers=processes) as renderers, \
+            ThreadPoolExecutor(max_workers=workers) as uploaders:
+        renders = {}
+        for digest, widths in needed.items():
+            missing = missing_widths(manifest, digest, widths)
+            if not missing or digest not in contents:
+                continue
+            renders[renderers.submit(render_variants, digest, contents[digest], missing)] = digest
+
+        def send(digest, path, data, content_type):
+            if dry_run or upload(session, path, data, content_type):
+                with lock:
+                    manifest["uploaded"].setdefault(digest, []).append(path)
+                    stats["uploaded"] += 1
+
+        uploads = []
+        for future in as_completed(renders):
+            digest = renders[future]
+            try:
+                variants = future.result()
+            except Exception as e:
+                print(f"⚠️ Image illisible ({digest[:12]}): {str(e)}")
+                continue
+            for path, (data, content_type) in variants.items():
+                uploads.append(uploaders.submit(send, digest, path, data, content_type))
+        for future in uploads:
+            future.result()
+
+    if not dry_run:
+        save_manifest(manifest)
+
+    # 4. Réécriture des champs vers la variante par défaut
+    uploaded = {digest: set(paths) for digest, paths in manifest["uploaded"].items()}
+    for data in dumps.values():
+        records = data["data"] if isinstance(data, dict) else data
+        for record in records:
+            for container, field, kind in iter_image_fields(record):
+                digest = manifest["urls"].get(container[field])
+                path = variant_path(digest, DEFAULT_WIDTH[kind], "webp") if digest else None
+                if path in uploaded.get(digest, ()):
+                    container[field] = public_url(path)
+
+    print(f"Images distinctes: {stats['urls']}, téléchargées: {stats['downloaded']}, "
+          f"doublons: {stats['duplicates']}, échecs: {stats['failed']}, variantes envoyées: {stats['uploaded']}")
+    return dumps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline d'images FloDrama")
+    parser.add_argument("dumps", nargs="+", help="Fichiers JSON à traiter")
+    parser.add_argument("--in-place", action="store_true", help="Réécrire les fichiers d'origine")
+    parser.add_argument("--workers", type=int, default=16, help="Téléchargements/envois simultanés")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 2, help="Processus de rendu")
+    parser.add_argument("--dry-run", action="store_true", help="Ne rien envoyer dans le bucket")
+    args = parser.parse_args()
+
+    if "avif" not in FORMATS:
+        print("⚠️ AVIF indisponible (installer pillow-avif-plugin) : seules les variantes WebP seront générées")
+
+    start_time = time.time()
+    dumps = process_dumps(args.dumps, args.workers, args.processes, args.dry_run)
+
+    if not args.dry_run:
+        for path, data in dumps.items():
+            output_file = path if args.in_place else path.replace(".json", ".images.json")
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            print(f"✅ {output_file}")
+
+    print(f"Terminé en {time.time() - start_time:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rapport de performance des sessions de scraping
+
+Lit les durées par étape enregistrées par le Worker de scraping dans
+scraping_logs (details.timings, voir scraping_spans.py) et affiche, par
+source et par étape, le p50 et le p95 sur l'ensemble des sessions. Les
+sources sont triées de la plus lente à la plus rapide et les étapes dont
+le p95 récent dépasse nettement l'historique sont signalées.
+
+Le Worker écrit ces journaux dans sa base D1 ; le rapport lit un export
+JSON de la table :
+    wrangler d1 execute flodrama-db --remote --json \
+        --command "SELECT source, created_at, details FROM scraping_logs" > logs.json
+
+Usage : python scripts/scraping_report.py logs.json [--days 30]
+        [--source voirdrama] [--recent 5] [--threshold 1.5]
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+
+from scraping_spans import STAGES, histogram_percentile, merge_histograms
+
+
+def load_d1_sessions(path, days, source=None):
+    """Retourne [(source, created_at, timings)] du plus ancien au plus récent depuis un export de wrangler d1 execute"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    # wrangler renvoie une liste de résultats, un par requête exécutée
+    if data and isinstance(data[0], dict) and "results" in data[0]:
+        data = [row for result in data for row in result["results"]]
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = []
+    for row in data:
+        if not row.get("created_at"):
+            continue
+        created_at = datetime.fromisoformat(row["created_at"].replace("Z", "+00:00"))
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        if created_at >= since and (not source or row["source"] == source):
+            rows.append((row["source"], created_at, row["details"]))
+    rows.sort(key=lambda row: row[1])
+    return parse_sessions(rows)
+
+
+def parse_sessions(rows):
+    """Extrait details.timings des lignes (source, created_at, details) qui en contiennent"""
+    sessions = []
+    for source_name, created_at, details in rows:
+        try:
+            timings = json.loads(details).get("timings")
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if timings and timings.get("stages"):
+            sessions.append((source_name, created_at, timings))
+    return sessions
+
+
+def build_report(sessions, recent=5, threshold=1.5):
+    """
+    Agrège les sessions par source et par étape.
+    Retourne {source: {"sessions", "total_ms", "stages": {étape: stats}}}
+    """
+    by_source = {}
+    for source, _, timings in sessions:
+        by_source.setdefault(source, []).append(timings)
+
+    report = {}
+    for source, source_sessions in by_source.items():
+        stages = {}
+        stage_names = [s for s in STAGES if any(s in t["stages"] for t in source_sessions)]
+        stage_names += sorted({
+            s for t in source_sessions for s in t["stages"] if s not in STAGES
+        })
+        for stage in stage_names:
+            histograms = [t["stages"][stage]["histogram"] for t in source_sessions if stage in t["stages"]]
+            merged = merge_histograms(histograms)
+            stats = {
+                "count": sum(merged.values()),
+                "total_ms": sum(t["stages"][stage]["total_ms"] for t in source_sessions if stage in t["stages"]),
+                "p50_ms": histogram_percentile(merged, 50),
+                "p95_ms": histogram_percentile(merged, 95),
+                "regression": None,
+            }
+
+            # Comparaison des dernières sessions avec l'historique
+            if len(histograms) > recent:
+                baseline = histogram_percentile(merge_histograms(histograms[:-recent]), 95)
+                latest = histogram_percentile(merge_histograms(histograms[-recent:]), 95)
+                if baseline and latest and latest > baseline * threshold:
+                    stats["regression"] = latest / baseline
+            stages[stage] = stats
+
+        report[source] = {
+            "sessions": len(source_sessions),
+            "total_ms": sum(s["total_ms"] for s in stages.values()),
+            "stages": stages,
+        }
+    return report
+
+
+def print_report(report):
+    """Affiche le rapport, sources les plus lentes en premier"""
+    if not report:
+        print("❌ Aucune session avec des mesures par étape")
+        return
+
+    ordered = sorted(report.items(), key=lambda item: item[1]["total_ms"] / item[1]["sessions"], reverse=True)
+    for source, data in ordered:
+        average = data["total_ms"] / data["sessions"] / 1000
+        print(f"\n{source} ({data['sessions']} sessions, {average:.1f}s en moyenne)")
+        print("-" * 70)
+        print(f"{'Étape':<12} {'Mesures':>9} {'p50 (ms)':>12} {'p95 (ms)':>12} {'Part':>8}")
+        print("-" * 70)
+        for stage, stats in data["stages"].items():
+            share = stats["total_ms"] / data["total_ms"] * 100 if data["total_ms"] else 0
+            line = f"{stage:<12} {stats['count']:>9} {stats['p50_ms']:>12.1f} {stats['p95_ms']:>12.1f} {share:>7.1f}%"
+            if stats["regression"]:
+                line += f"  ⚠️ p95 x{stats['regression']:.1f}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rapport de performance des sessions de scraping")
+    parser.add_argument("export", help="Export JSON de scraping_logs depuis D1 (wrangler d1 execute --json)")
+    parser.add_argument("--days", type=int, default=30, help="Période analysée en jours")
+    parser.add_argument("--source", help="Limiter le rapport à une source")
+    parser.add_argument("--recent", type=int, default=5, help="Nombre de sessions récentes comparées à l'historique")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Facteur de p95 signalé comme régression")
+    args = parser.parse_args()
+
+    try:
+        sessions = load_d1_sessions(args.export, args.days, args.source)
+    except Exception as e:
+        print(f"Erreur: {str(e)}")
+        return 1
+
+    print_report(build_report(sessions, args.recent, args.threshold))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
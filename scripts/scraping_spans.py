@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Histogrammes des durées par étape des sessions de scraping
+
+Le Worker de scraping (cloudflare/scraping/src/scraping-spans.js) agrège
+les durées de chaque source dans des histogrammes logarithmiques et les
+écrit dans le champ details.timings de scraping_logs :
+
+    {"source", "wall_ms", "stages": {étape: {"count", "total_ms", "max_ms",
+     "p50_ms", "p95_ms", "histogram": {indice: nombre}}}}
+
+Ces fonctions relisent ce format ; les histogrammes de plusieurs sessions
+se fusionnent par simple addition des seaux. StageTimings produit le même
+format pour les scripts Python (ex. validation et COPY de bulk_ingest.py).
+"""
+
+import math
+import time
+from contextlib import contextmanager
+
+# Étapes standard d'une session de scraping
+STAGES = ("fetch", "parse", "normalize", "validate", "store")
+
+# Précision des histogrammes : 8 seaux par puissance de 2 (~9% d'erreur)
+BUCKETS_PER_OCTAVE = 8
+
+
+def bucket_index(duration_ms):
+    """Retourne l'indice du seau d'histogramme pour une durée en millisecondes"""
+    if duration_ms <= 1:
+        return 0
+    return int(math.ceil(math.log2(duration_ms) * BUCKETS_PER_OCTAVE))
+
+
+def bucket_upper_bound(index):
+    """Retourne la borne haute (en millisecondes) d'un seau d'histogramme"""
+    return 2 ** (index / BUCKETS_PER_OCTAVE)
+
+
+def histogram_percentile(histogram, percentile):
+    """
+    Calcule un percentile (0-100) à partir d'un histogramme {indice: nombre}.
+    Les clés peuvent être des chaînes (histogramme relu depuis du JSON).
+    """
+    buckets = sorted((int(k), v) for k, v in histogram.items())
+    total = sum(v for _, v in buckets)
+    if not total:
+        return None
+    rank = percentile / 100 * total
+    seen = 0
+    for index, count in buckets:
+        seen += count
+        if seen >= rank:
+            return bucket_upper_bound(index)
+    return bucket_upper_bound(buckets[-1][0])
+
+
+def merge_histograms(histograms):
+    """Fusionne plusieurs histogrammes {indice: nombre}"""
+    merged = {}
+    for histogram in histograms:
+        for index, count in histogram.items():
+            merged[int(index)] = merged.get(int(index), 0) + count
+    return merged
+
+
+
+class StageTimings:
+    """Collecteur de durées par étape, équivalent Python de ScrapingSpans"""
+
+    def __init__(self, source):
+        self.source = source
+        self.stages = {}
+        self.started_at = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage):
+        """Attribue la durée du bloc à l'étape donnée"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def record(self, stage, duration_ms):
+        """Enregistre une durée pour une étape"""
+        stats = self.stages.setdefault(stage, {"count": 0, "total_ms": 0, "max_ms": 0, "histogram": {}})
+        index = bucket_index(duration_ms)
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["histogram"][index] = stats["histogram"].get(index, 0) + 1
+
+    def summary(self):
+        """Statistiques agrégées, au format de details.timings"""
+        stages = {}
+        for stage, stats in self.stages.items():
+            stages[stage] = {
+                "count": stats["count"],
+                "total_ms": stats["total_ms"],
+                "max_ms": stats["max_ms"],
+                "p50_ms": histogram_percentile(stats["histogram"], 50),
+                "p95_ms": histogram_percentile(stats["histogram"], 95),
+                "histogram": dict(stats["histogram"]),
+            }
+        return {
+            "source": self.source,
+            "wall_ms": (time.perf_counter() - self.started_at) * 1000,
+            "stages": stages,
+        }
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du contrôle d'admission du serveur relais
+(cloudflare/scraping/deta-relay/admission.py) : ordre de la file,
+remplacement par une requête plus prioritaire et expiration de l'attente.
+
+Usage : python test_admission.py
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "cloudflare", "scraping", "deta-relay"))
+
+from admission import AdmissionController, QueueFullError
+
+
+async def hold(controller, client, priority, order, release):
+    """Prend une place, note l'ordre d'admission puis attend release"""
+    async with controller.slot(client, priority):
+        order.append((client, priority))
+        await release.wait()
+
+
+async def settle():
+    """Laisse les requêtes lancées atteindre la file d'attente"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class AdmissionControllerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_priority_then_round_robin(self):
+        controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait=5)
+        release = asyncio.Event()
+        order = []
+        tasks = [asyncio.create_task(hold(controller, "busy", "detail", order, release))]
+        await settle()
+
+        for client, priority in [("a", "detail"), ("a", "detail"), ("b", "detail"), ("c", "listing"), ("a", "retry")]:
+            tasks.append(asyncio.create_task(hold(controller, client, priority, order, release)))
+            await settle()
+        self.assertEqual(controller.snapshot()["waiting"], 5)
+
+        # Chaque requête admise rend aussitôt sa place à la suivante
+        release.set()
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(order, [
+            ("busy", "detail"),
+            ("c", "listing"),
+            ("a", "detail"),
+            ("b", "detail"),
+            ("a", "detail"),
+            ("a", "retry"),
+        ])
+        self.assertEqual(controller.snapshot()["running"], 0)
+        self.assertEqual(controller.snapshot()["waiting"], 0)
+
+    async def test_higher_priority_evicts_newest_lower_priority(self):
+        controller = AdmissionController(max_concurrency=1, max_queue=2, max_wait=5)
+        release = asyncio.Event()
+        order = []
+        holder = asyncio.create_task(hold(controller, "busy", "detail", order, release))
+        await settle()
+        older = asyncio.create_task(hold(controller, "a", "retry", order, release))
+        await settle()
+        newer = asyncio.create_task(hold(controller, "b", "retry", order, release))
+        await settle()
+
+        # File pleine : une requête de liste remplace la dernière nouvelle tentative
+        listing = asyncio.create_task(hold(controller, "c", "listing", order, release))
+        await settle()
+        with self.assertRaises(QueueFullError):
+            await newer
+
+        # File pleine sans requête moins prioritaire : refus immédiat
+        with self.assertRaises(QueueFullError):
+            await hold(controller, "d", "retry", order, release)
+
+        release.set()
+        await asyncio.gather(holder, older, listing)
+        self.assertEqual(order, [("busy", "detail"), ("c", "listing"), ("a", "retry")])
+        self.assertEqual(controller.stats["evicted"], 1)
+        self.assertEqual(controller.stats["rejected"], 1)
+        self.assertEqual(controller.snapshot()["running"], 0)
+        self.assertEqual(controller.snapshot()["waiting"], 0)
+
+    async def test_wait_expires(self):
+        controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait=0.05)
+        release = asyncio.Event()
+        order = []
+        holder = asyncio.create_task(hold(controller, "busy", "detail", order, release))
+        await settle()
+
+        with self.assertRaises(QueueFullError):
+            await hold(controller, "a", "detail", order, release)
+        self.assertEqual(controller.stats["expired"], 1)
+        self.assertEqual(controller.snapshot()["waiting"], 0)
+
+        release.set()
+        await holder
+        self.assertEqual(controller.snapshot()["running"], 0)
+
+    async def test_cancelled_after_eviction_keeps_no_slot(self):
+        controller = AdmissionController(max_concurrency=1, max_queue=10, max_wait=5)
+        release = asyncio.Event()
+        order = []
+        holder = asyncio.create_task(hold(controller, "busy", "detail", order, release))
+        await settle()
+        waiter = asyncio.create_task(hold(controller, "a", "retry", order, release))
+        await settle()
+
+        # Déconnexion du client, puis remplacement avant qu'il ne reprenne la main
+        waiter.cancel()
+        self.assertTrue(controller._evict("listing"))
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+
+        self.assertEqual(controller.snapshot()["running"], 1)
+        self.assertEqual(controller.snapshot()["waiting"], 0)
+        release.set()
+        await holder
+        self.assertEqual(controller.snapshot()["running"], 0)
+        self.assertEqual(order, [("busy", "detail")])
+
+
+if __name__ == "__main__":
+    unittest.main()
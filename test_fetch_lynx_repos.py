@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du client GitHub de scripts/fetch_lynx_repos.py contre une API locale
+simulée : attente de Retry-After sur les limites secondaires (403/429) et
+erreur immédiate sur un 403 sans limite de requêtes.
+
+Usage : python test_fetch_lynx_repos.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+import requests
+
+from fetch_lynx_repos import GitHubClient
+
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    """Répond avec les réponses préparées dans server.responses, dans l'ordre"""
+
+    def do_GET(self):
+        status, headers, body = self.server.responses.pop(0)
+        self.server.requests.append((self.path, time.monotonic()))
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GitHubClientRateLimitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+        self.server.responses = []
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = GitHubClient(f"http://127.0.0.1:{self.server.server_port}", token="test")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def assert_retried_after(self, status):
+        self.server.responses = [
+            (status, {"Retry-After": "1", "X-RateLimit-Remaining": "4000"},
+             {"message": "You have exceeded a secondary rate limit"}),
+            (200, {"X-RateLimit-Remaining": "3999"}, [{"name": "lynx"}]),
+        ]
+        body, _ = self.client.get("/orgs/lynx-family/repos")
+
+        self.assertEqual(body, [{"name": "lynx"}])
+        self.assertEqual(self.client.stats["requests"], 2)
+        (_, first), (_, second) = self.server.requests
+        self.assertGreaterEqual(second - first, 1)
+
+    def test_secondary_rate_limit_403_honours_retry_after(self):
+        self.assert_retried_after(403)
+
+    def test_secondary_rate_limit_429_honours_retry_after(self):
+        self.assert_retried_after(429)
+
+    def test_forbidden_without_rate_limit_raises(self):
+        self.server.responses = [
+            (403, {"X-RateLimit-Remaining": "4000"}, {"message": "Resource not accessible"}),
+        ]
+        with self.assertRaises(requests.HTTPError):
+            self.client.get("/orgs/lynx-family/repos")
+        self.assertEqual(self.client.stats["requests"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()